@@ -0,0 +1,199 @@
+"""
+An in process fake of the Shopify Admin REST API, to be mounted with
+`httpx.MockTransport`. It serves generated orders, products and
+customers with `Link` pagination, a server side leaky bucket reported
+in `X-Shopify-Shop-Api-Call-Limit`, injected latency and random 429s.
+"""
+
+import asyncio
+import random
+import re
+import time
+
+import httpx
+
+ITEM = re.compile(
+    r"/admin/api/[^/]+/(?P<resource>\w+)(?:/(?P<id>\d+))?(?P<count>/count)?\.json$"
+)
+
+
+def money(amount: str) -> dict:
+    return {
+        "shop_money": {"amount": amount, "currency_code": "USD"},
+        "presentment_money": {"amount": amount, "currency_code": "USD"},
+    }
+
+
+def make_order(order_id: int) -> dict:
+    address = {
+        "address1": "123 Amoebobacterieae St",
+        "address2": "",
+        "city": "Ottawa",
+        "company": None,
+        "country": "Canada",
+        "first_name": "Bob",
+        "last_name": "Bobsen",
+        "phone": "555-625-1199",
+        "province": "Ontario",
+        "zip": "K2P0V6",
+        "name": "Bob Bobsen",
+        "province_code": "ON",
+        "country_code": "CA",
+        "latitude": "45.41634",
+        "longitude": "-75.6868",
+    }
+    price = f"{(order_id * 7919) % 100000 / 100:.2f}"
+    day = 1 + order_id % 28
+    return {
+        "id": order_id,
+        "name": f"#{1000 + order_id}",
+        "email": f"customer{order_id}@example.com",
+        "created_at": f"2024-01-{day:02d}T10:00:00-05:00",
+        "updated_at": f"2024-01-{day:02d}T12:00:00-05:00",
+        "processed_at": f"2024-01-{day:02d}T10:00:00-05:00",
+        "currency": "USD",
+        "financial_status": ("paid", "pending", "refunded")[order_id % 3],
+        "fulfillment_status": None,
+        "total_price": price,
+        "total_price_set": money(price),
+        "subtotal_price": price,
+        "subtotal_price_set": money(price),
+        "total_tax": "0.00",
+        "total_tax_set": money("0.00"),
+        "total_discounts": "0.00",
+        "current_total_price": price,
+        "current_total_price_set": money(price),
+        "billing_address": address,
+        "shipping_address": dict(address),
+        "customer": {
+            "id": order_id * 10,
+            "email": f"customer{order_id}@example.com",
+            "first_name": "Bob",
+            "last_name": "Bobsen",
+            "default_address": dict(address),
+            "addresses": [dict(address)],
+        },
+        "line_items": [
+            {
+                "id": order_id * 100 + i,
+                "title": f"Product {i}",
+                "quantity": 1 + i,
+                "price": "19.99",
+                "sku": f"SKU-{i}",
+                "tax_lines": [{"price": "0.00", "rate": 0.0, "title": "Tax"}],
+            }
+            for i in range(3)
+        ],
+        "shipping_lines": [
+            {"code": "Standard", "price": "5.00", "title": "Standard", "tax_lines": []}
+        ],
+        "tax_lines": [{"price": "0.00", "rate": 0.0, "title": "Tax"}],
+        "tags": "",
+        "note": None,
+    }
+
+
+class FakeShopify:
+    """
+    The fake API. `latency` seconds (plus up to `jitter`) are slept per
+    request, `throttle_rate` of the requests are answered 429 at random,
+    and requests beyond the bucket are answered 429 like Shopify does.
+    """
+
+    def __init__(
+        self,
+        *,
+        orders: int = 10_000,
+        latency: float = 0.005,
+        jitter: float = 0.002,
+        throttle_rate: float = 0.0,
+        bucket_size: int = 400,
+        leak_rate: float = 2000.0,
+    ) -> None:
+        self.orders = orders
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.bucket_size = bucket_size
+        self.leak_rate = leak_rate
+        self.level = 0.0
+        self.updated = time.monotonic()
+        self.requests = 0
+        self.throttled = 0
+        self.not_modified = 0
+
+    def order(self, order_id: int) -> dict:
+        # Generated per request and not kept, so the fake's memory stays
+        # out of the client's numbers
+        return make_order(order_id)
+
+    def _take(self) -> bool:
+        now = time.monotonic()
+        self.level = max(0.0, self.level - (now - self.updated) * self.leak_rate)
+        self.updated = now
+        if self.level + 1 > self.bucket_size:
+            return False
+        self.level += 1
+        return True
+
+    def _headers(self) -> dict[str, str]:
+        return {
+            "X-Shopify-Shop-Api-Call-Limit": f"{int(self.level)}/{self.bucket_size}"
+        }
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.random() * self.jitter)
+
+        if not self._take() or random.random() < self.throttle_rate:
+            self.throttled += 1
+            return httpx.Response(
+                429, headers={**self._headers(), "Retry-After": "0.05"}
+            )
+
+        match = ITEM.search(request.url.path)
+        if match is None:
+            return httpx.Response(404, headers=self._headers())
+
+        resource, item_id = match["resource"], match["id"]
+        if match["count"]:
+            return httpx.Response(
+                200, json={"count": self.orders}, headers=self._headers()
+            )
+
+        if request.method == "PUT":
+            return httpx.Response(
+                200,
+                content=b'{"%s":{"id":%s}}'
+                % (resource[:-1].encode(), item_id.encode()),
+                headers=self._headers(),
+            )
+
+        if item_id is not None:
+            # Items never change, so their id is a fine ETag
+            etag = f'"{resource}-{item_id}"'
+            if request.headers.get("If-None-Match") == etag:
+                self.not_modified += 1
+                return httpx.Response(304, headers={**self._headers(), "ETag": etag})
+            return httpx.Response(
+                200,
+                json={resource[:-1]: {**self.order(int(item_id)), "title": "Fake"}},
+                headers={**self._headers(), "ETag": etag},
+            )
+
+        return self._page(request, resource)
+
+    def _page(self, request: httpx.Request, resource: str) -> httpx.Response:
+        params = request.url.params
+        limit = int(params.get("limit", 50))
+        start = int(params.get("page_info", 0))
+        end = min(start + limit, self.orders)
+
+        headers = self._headers()
+        if end < self.orders:
+            next_url = request.url.copy_with(params={"limit": limit, "page_info": end})
+            headers["Link"] = f'<{next_url}>; rel="next"'
+
+        items = [self.order(i) for i in range(start, end)]
+        return httpx.Response(200, json={resource: items}, headers=headers)
@@ -0,0 +1,261 @@
+"""
+Benchmarks of shopipy against the in process fake Admin API.
+
+    python -m benchmarks.run                 # every scenario
+    python -m benchmarks.run order_walk      # some of them
+    python -m benchmarks.run --json
+
+Each scenario runs in its own process and reports requests/sec, p50/p99
+request latency and how much the peak RSS grew over the idle process.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from dataclasses import asdict, dataclass, field
+
+import httpx
+
+from shopipy.cache import SQLiteValidatorStore
+from shopipy.metrics import RequestEvent
+from shopipy.models import Order, decode_list
+from shopipy.ratelimit import LeakyBucket
+from shopipy.shopify import RequestType, Shopify
+
+from .fake_shopify import FakeShopify, make_order
+
+
+@dataclass
+class Result:
+    scenario: str
+    seconds: float
+    operations: int
+    requests: int
+    p50_ms: float = 0.0
+    p99_ms: float = 0.0
+    rss_growth_mb: float = 0.0
+    notes: dict = field(default_factory=dict)
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.seconds if self.seconds else 0.0
+
+
+class Latencies:
+    """
+    A request hook keeping every latency, for exact percentiles.
+    """
+
+    def __init__(self) -> None:
+        self.values: list[float] = []
+
+    def __call__(self, event: RequestEvent) -> None:
+        self.values.append(event.latency)
+
+    def percentile(self, q: float) -> float:
+        if len(self.values) < 2:
+            return self.values[0] * 1000 if self.values else 0.0
+        return statistics.quantiles(self.values, n=100)[int(q) - 1] * 1000
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def client(fake: FakeShopify, latencies: Latencies, **kwargs) -> Shopify:
+    shopify = Shopify(
+        "bench",
+        admin_key="bench",
+        transport=httpx.MockTransport(fake),
+        hooks=[latencies],
+        **kwargs,
+    )
+    # Leak at the fake's rate rather than the 20s drain of a real store
+    shopify.bucket = LeakyBucket(fake.bucket_size, leak_rate=fake.leak_rate)
+    return shopify
+
+
+async def order_walk(orders: int = 20_000) -> Result:
+    fake = FakeShopify(orders=orders)
+    latencies = Latencies()
+    async with client(fake, latencies) as shopify:
+        start = time.perf_counter()
+        walked = 0
+        async for _ in shopify.iter_orders():
+            walked += 1
+        seconds = time.perf_counter() - start
+
+    return Result(
+        "order_walk",
+        seconds,
+        walked,
+        fake.requests,
+        latencies.percentile(50),
+        latencies.percentile(99),
+        notes={"orders/s": round(walked / seconds)},
+    )
+
+
+async def bulk_edit(edits: int = 5_000, max_concurrency: int = 50) -> Result:
+    fake = FakeShopify(throttle_rate=0.01)
+    latencies = Latencies()
+    async with client(fake, latencies) as shopify:
+        requests = (
+            {
+                "url_json_path": f"products/{i}.json",
+                "method": RequestType.EDIT,
+                "json": {"product": {"id": i, "title": f"Product {i}"}},
+            }
+            for i in range(edits)
+        )
+        start = time.perf_counter()
+        done = 0
+        async for _, resp in shopify.iter_bulk_request(
+            requests, max_concurrency=max_concurrency
+        ):
+            done += resp.status_code == 200
+        seconds = time.perf_counter() - start
+
+    return Result(
+        "bulk_edit",
+        seconds,
+        done,
+        fake.requests,
+        latencies.percentile(50),
+        latencies.percentile(99),
+        notes={"throttled": fake.throttled},
+    )
+
+
+def sync_overhead(calls: int = 2_000) -> Result:
+    fake = FakeShopify(latency=0, jitter=0)
+    latencies = Latencies()
+    shopify = client(fake, latencies)
+    shopify.get_products_sync(product_id=1)
+
+    start = time.perf_counter()
+    for i in range(calls):
+        shopify.get_products_sync(product_id=i)
+    seconds = time.perf_counter() - start
+    shopify.close()
+
+    return Result(
+        "sync_overhead",
+        seconds,
+        calls,
+        fake.requests - 1,
+        latencies.percentile(50),
+        latencies.percentile(99),
+        notes={"us/call": round(seconds / calls * 1e6, 1)},
+    )
+
+
+def conditional_poll(calls: int = 2_000) -> Result:
+    """
+    Poll one product through the sync facade with validators on disk,
+    every poll after the first should be answered 304.
+    """
+    fake = FakeShopify(latency=0, jitter=0)
+    latencies = Latencies()
+    with tempfile.TemporaryDirectory() as tmp:
+        validators = SQLiteValidatorStore(f"{tmp}/validators.sqlite3")
+        shopify = client(fake, latencies, validators=validators)
+        shopify.get_products_sync(product_id=1)
+
+        start = time.perf_counter()
+        for _ in range(calls):
+            shopify.get_products_sync(product_id=1)
+        seconds = time.perf_counter() - start
+        shopify.close()
+        validators.close()
+
+    if fake.not_modified != calls:
+        raise RuntimeError(f"{fake.not_modified} of {calls} polls revalidated")
+    return Result(
+        "conditional_poll",
+        seconds,
+        calls,
+        fake.requests - 1,
+        latencies.percentile(50),
+        latencies.percentile(99),
+        notes={"us/call": round(seconds / calls * 1e6, 1)},
+    )
+
+
+def order_decode(pages: int = 200, page_size: int = 250) -> Result:
+    page = json.loads(json.dumps([make_order(i) for i in range(page_size)]))
+
+    start = time.perf_counter()
+    for _ in range(pages):
+        orders = decode_list(Order, page)
+        for o in orders:
+            o.id, o.total_price
+    seconds = time.perf_counter() - start
+
+    return Result(
+        "order_decode",
+        seconds,
+        pages * page_size,
+        0,
+        notes={"us/order": round(seconds / (pages * page_size) * 1e6, 2)},
+    )
+
+
+SCENARIOS = {
+    "order_walk": lambda: asyncio.run(order_walk()),
+    "bulk_edit": lambda: asyncio.run(bulk_edit()),
+    "sync_overhead": sync_overhead,
+    "conditional_poll": conditional_poll,
+    "order_decode": order_decode,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("scenarios", nargs="*", help=", ".join(SCENARIOS))
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    parser.add_argument("--in-process", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    if args.in_process:
+        # ru_maxrss only grows, so one scenario per process
+        (name,) = args.scenarios
+        baseline = peak_rss_mb()
+        result = SCENARIOS[name]()
+        result.rss_growth_mb = peak_rss_mb() - baseline
+        print(json.dumps({**asdict(result), "requests_per_s": result.rate}))
+        return
+
+    for name in args.scenarios or SCENARIOS:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--in-process", name],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        if args.json:
+            print(out, end="")
+            continue
+        row = json.loads(out)
+        print(
+            f"{row['scenario']:<14} {row['seconds']:8.2f}s "
+            f"{row['requests_per_s']:10.0f} req/s  p50 {row['p50_ms']:7.2f}ms "
+            f"p99 {row['p99_ms']:7.2f}ms  rss +{row['rss_growth_mb']:6.1f}MB  "
+            f"{row['notes']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from .metrics import RequestEvent
+
+
+class AdaptiveConcurrency:
+    """
+    An AIMD (additive increase, multiplicative decrease) limit on the
+    requests in flight, like TCP congestion control.
+
+    While responses are healthy and the bucket has headroom, the limit
+    grows by about `increase` per round trip. A 429, a 5xx, a transport
+    error or latency above `latency_tolerance` times the baseline cuts
+    it by `backoff`, at most once per round trip. So does a request that
+    had to be retried.
+
+    A `Shopify` instance keeps one and feeds it every request, so the
+    limit converges per store and carries over between bulk jobs.
+    """
+
+    def __init__(
+        self,
+        initial: int = 10,
+        *,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        increase: float = 1.0,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        headroom: float = 0.1,
+    ) -> None:
+        """
+        `headroom` is the share of the bucket that has to stay free for
+        the limit to grow.
+        """
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise AttributeError("Expected min_limit <= initial <= max_limit")
+        if not 0 < backoff < 1:
+            raise AttributeError("backoff must be between 0 and 1")
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.headroom = headroom
+        self.baseline: float | None = None
+        self.recent: float | None = None
+        self._sent = 0
+        self._cut_after = 0
+
+    @property
+    def current(self) -> int:
+        """
+        The number of requests to keep in flight now
+        """
+        return int(self.limit)
+
+    def start(self) -> int:
+        """
+        Note a request being sent, pass the returned ticket to `record`.
+        """
+        self._sent += 1
+        return self._sent
+
+    def record(self, ticket: int, event: RequestEvent, *, in_flight: int) -> None:
+        """
+        Adjust the limit with the outcome of a request.
+        `in_flight` counts the request too.
+        """
+        # Waiting on our own rate limiter isn't the server slowing down
+        latency = event.latency - event.queue_time
+        # A fast moving average of the latency against its slow moving floor
+        if self.recent is None or self.baseline is None:
+            recent = baseline = latency
+        else:
+            recent = self.recent + (latency - self.recent) * 0.3
+            baseline = self.baseline
+            if recent < baseline:
+                baseline = recent
+            else:
+                baseline += (recent - baseline) * 0.01
+        self.recent, self.baseline = recent, baseline
+
+        status = event.status
+        congested = (
+            status is None or status == 429 or status >= 500 or event.retries > 0
+        )
+        if congested or recent > baseline * self.latency_tolerance:
+            # Requests sent before the last cut saw the old limit
+            if ticket > self._cut_after:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._cut_after = self._sent
+            return
+
+        # Only grow when the limit is what holds requests back
+        if event.bucket_fill <= 1 - self.headroom and in_flight >= self.current:
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
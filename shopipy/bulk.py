@@ -0,0 +1,264 @@
+import asyncio
+import json
+import re
+
+from typing import Any, AsyncIterator
+
+import httpx
+
+from .graphql import GraphQLError
+from .models import Order
+from .models.decode import decode
+from .shopify import ReturnMode, Shopify
+
+ORDERS_QUERY = """
+{
+  orders {
+    edges {
+      node {
+        id
+        name
+        email
+        createdAt
+        updatedAt
+        financialStatus
+        fulfillmentStatus
+        currencyCode
+        totalPriceSet { shopMoney { amount currencyCode } }
+        lineItems {
+          edges {
+            node {
+              id
+              name
+              sku
+              quantity
+              originalUnitPriceSet { shopMoney { amount currencyCode } }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+RUN_QUERY = """
+mutation($query: String!) {
+  bulkOperationRunQuery(query: $query) {
+    bulkOperation { id status }
+    userErrors { field message }
+  }
+}
+"""
+
+POLL_QUERY = """
+query($id: ID!) {
+  node(id: $id) {
+    ... on BulkOperation { id status errorCode objectCount url partialDataUrl }
+  }
+}
+"""
+
+FINISHED = {"COMPLETED", "FAILED", "CANCELED", "EXPIRED"}
+
+_CAMEL = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+class BulkOperationError(Exception):
+    pass
+
+
+def snake_case(value: Any) -> Any:
+    """
+    Convert the camelCase keys of a GraphQL record to the REST snake_case names.
+    """
+    if isinstance(value, dict):
+        return {_CAMEL.sub("_", k).lower(): snake_case(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [snake_case(v) for v in value]
+    return value
+
+
+# GraphQL enums whose REST values are the same names in lower case
+ENUM_FIELDS = {"financial_status", "fulfillment_status"}
+
+
+def gid_id(gid: str) -> int:
+    """
+    The numeric REST id of a GraphQL id, e.g. 1 for `gid://shopify/Order/1`
+    """
+    return int(gid.rsplit("/", 1)[1].split("?")[0])
+
+
+def rest_values(value: Any) -> Any:
+    """
+    Convert the values of a snake_cased GraphQL record to their REST form.
+    Ids become numeric, enums lower case, and a `*_set` money field also
+    sets its shop amount, e.g. `total_price` from `total_price_set`.
+    """
+    if isinstance(value, list):
+        return [rest_values(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+
+    record = {k: rest_values(v) for k, v in value.items()}
+    legacy_id = record.pop("legacy_resource_id", None)
+    if legacy_id is not None:
+        record["id"] = int(legacy_id)
+    elif isinstance(record.get("id"), str) and record["id"].startswith("gid://"):
+        record["id"] = gid_id(record["id"])
+
+    for key in ENUM_FIELDS & record.keys():
+        if isinstance(record[key], str):
+            record[key] = record[key].lower()
+
+    for key, money in list(record.items()):
+        if key.endswith("_set") and isinstance(money, dict) and "shop_money" in money:
+            record.setdefault(key.removesuffix("_set"), money["shop_money"]["amount"])
+    return record
+
+
+def child_key(gid: str) -> str:
+    """
+    The key children are collected under, from their GraphQL id,
+    e.g. `gid://shopify/LineItem/1` goes under `lineItems`.
+    """
+    type_name = gid.split("/")[3]
+    return type_name[0].lower() + type_name[1:] + "s"
+
+
+class BulkExporter:
+    """
+    Export a whole store through a GraphQL bulk operation.
+
+    The operation runs on Shopify's side, and the resulting JSONL file is
+    streamed line by line, so an export of millions of records runs in
+    constant memory and takes only a handful of API calls.
+    """
+
+    def __init__(
+        self,
+        shopify: Shopify,
+        *,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 30.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        """
+        `poll_interval` grows by half on every poll up to `max_poll_interval`.
+        `transport` is used for downloading the result file.
+        """
+        self.shopify = shopify
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.transport = transport
+
+    async def _graphql(self, query: str, variables: dict[str, Any]) -> dict:
+        try:
+            return await self.shopify.graphql(query, variables)
+        except GraphQLError as e:
+            raise BulkOperationError(e.errors) from e
+
+    async def submit(self, query: str) -> str:
+        """
+        Start a bulk operation for `query` and return its id.
+        """
+        data = await self._graphql(RUN_QUERY, {"query": query})
+        result = data["bulkOperationRunQuery"]
+        if result["userErrors"]:
+            raise BulkOperationError(result["userErrors"])
+        return result["bulkOperation"]["id"]
+
+    async def wait(self, operation_id: str) -> dict:
+        """
+        Poll the operation with backoff until it finishes and return it.
+        """
+        interval = self.poll_interval
+        while True:
+            data = await self._graphql(POLL_QUERY, {"id": operation_id})
+            operation = data["node"]
+            if operation["status"] in FINISHED:
+                break
+            await asyncio.sleep(interval)
+            interval = min(self.max_poll_interval, interval * 1.5)
+
+        if operation["status"] != "COMPLETED":
+            raise BulkOperationError(
+                f"Bulk operation {operation['status']}: {operation['errorCode']}"
+            )
+        return operation
+
+    async def stream(self, url: str | None) -> AsyncIterator[dict]:
+        """
+        Yield the raw rows of a result file.
+        A finished operation without results has no url.
+        """
+        if url is None:
+            return
+
+        # The file is on a signed url, the access token must not be sent there
+        async with httpx.AsyncClient(transport=self.transport, timeout=60) as client:
+            async with client.stream("GET", url) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if line:
+                        yield json.loads(line)
+
+    async def records(self, url: str | None) -> AsyncIterator[dict]:
+        """
+        Yield the records of a result file, with child rows attached to
+        their parent. Children of a node are collected in a list named
+        after their type, e.g. line items of an order go in `lineItems`.
+        """
+        current: dict | None = None
+        index: dict[str, dict] = {}
+
+        async for row in self.stream(url):
+            parent_id = row.pop("__parentId", None)
+            if parent_id is None:
+                if current is not None:
+                    yield current
+                current = row
+                index = {row["id"]: row}
+                continue
+
+            parent = index.get(parent_id)
+            if parent is None:
+                raise BulkOperationError(f"Row came before its parent {parent_id}")
+
+            key = child_key(row["id"]) if "id" in row else "children"
+            parent.setdefault(key, []).append(row)
+            if "id" in row:
+                index[row["id"]] = row
+
+        if current is not None:
+            yield current
+
+    async def export(self, query: str) -> AsyncIterator[dict]:
+        """
+        Run `query` as a bulk operation and yield its records
+        """
+        operation = await self.wait(await self.submit(query))
+        async for record in self.records(operation["url"]):
+            yield record
+
+    async def export_orders(
+        self,
+        query: str = ORDERS_QUERY,
+        *,
+        return_mode: ReturnMode = ReturnMode.DICT,
+    ) -> AsyncIterator[dict | Order]:
+        """
+        Export every order with its line items.
+
+        With `ReturnMode.MODEL` keys and values are converted to their REST
+        form, see `rest_values`, and `Order` models are built, with the
+        fields that weren't queried set to None.
+        """
+        async for record in self.export(query):
+            if return_mode == ReturnMode.MODEL:
+                order = rest_values(snake_case(record))
+                order.setdefault("currency", order.get("currency_code"))
+                yield decode(Order, order)
+            else:
+                yield record
@@ -0,0 +1,391 @@
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import httpx
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable
+from urllib.parse import urlencode
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A size bounded LRU mapping whose entries also expire after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            expires, value = self._data[key]
+        except KeyError:
+            return default
+
+        if expires < time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def add(self, key: Hashable, value: Any = True) -> bool:
+        """
+        Set `key` only if it isn't there yet. Returns whether it was added.
+        """
+        if key in self:
+            return False
+        self.set(key, value)
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+ITEM_PATH = re.compile(r"(?:^|/)(?P<resource>[a-z_]+)/(?P<id>\d+)\.json$")
+
+
+def item_key(url_json_path: str) -> tuple[str, str] | None:
+    """
+    The resource and id of a single item path, e.g. `("products", "1")`
+    """
+    match = ITEM_PATH.search(url_json_path)
+    return (match["resource"], match["id"]) if match else None
+
+
+def webhook_items(topic: str, payload: Any) -> list[tuple[str, str]]:
+    """
+    The items a webhook is about, e.g. a `products/update` delivery
+    is about `("products", id)`.
+    """
+    if not isinstance(payload, dict) or "id" not in payload:
+        return []
+    items = [(topic.split("/")[0], str(payload["id"]))]
+    # An order embeds its fulfillments and refunds
+    if "order_id" in payload:
+        items.append(("orders", str(payload["order_id"])))
+    return items
+
+
+class ResponseCache:
+    """
+    A read-through cache of single resource GETs, e.g. `products/1.json`.
+
+    Entries are grouped per resource and id, so an edit or a delete of the
+    item, or a webhook about it, evicts every cached variant of it.
+    `ttls` sets the lifetime per resource, e.g. `{"products": 300}`.
+
+    Every eviction of an item bumps its generation. Read it before a GET
+    and pass it to `set`, so a response that raced an edit isn't cached.
+
+    Every method takes the `store` the item belongs to, so one cache can
+    be shared by the clients of several stores.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 60.0,
+        ttls: dict[str, float] | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self._items = TTLCache(maxsize, ttl)
+        self._generations: OrderedDict[tuple, int] = OrderedDict()
+        self._counter = itertools.count(1)
+        # Items without a generation of their own have this one, it only grows
+        # as old generations are dropped so a dropped one never reads as unchanged
+        self._floor = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _item(self, url_json_path: str, store: str | None) -> tuple | None:
+        item = item_key(url_json_path)
+        return None if item is None else (store, *item)
+
+    def get(
+        self, url_json_path: str, params: dict[str, Any], *, store: str | None = None
+    ) -> Any:
+        item = self._item(url_json_path, store)
+        if item is None:
+            return None
+        variants = self._items.get(item)
+        if variants is None:
+            return None
+
+        key = (url_json_path, freeze_params(params))
+        entry = variants.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del variants[key]
+            return None
+        return value
+
+    def generation(self, url_json_path: str, *, store: str | None = None) -> int:
+        item = self._item(url_json_path, store)
+        if item is None:
+            return self._floor
+        return self._generations.get(item, self._floor)
+
+    def set(
+        self,
+        url_json_path: str,
+        params: dict[str, Any],
+        value: Any,
+        generation: int | None = None,
+        *,
+        store: str | None = None,
+    ) -> None:
+        """
+        Cache a response, unless the item was evicted since `generation`.
+        """
+        item = self._item(url_json_path, store)
+        if item is None:
+            return
+        if generation is not None and generation != self.generation(
+            url_json_path, store=store
+        ):
+            return
+
+        ttl = self.ttls.get(item[1], self.ttl)
+        # Variants expire on their own, the item lives as long as the newest
+        variants = self._items.get(item) or {}
+        variants[(url_json_path, freeze_params(params))] = (
+            time.monotonic() + ttl,
+            value,
+        )
+        self._items.set(item, variants, ttl)
+
+    def __evict(self, item: tuple) -> None:
+        self._items.pop(item)
+        self._generations[item] = next(self._counter)
+        self._generations.move_to_end(item)
+        while len(self._generations) > self.maxsize:
+            _, self._floor = self._generations.popitem(last=False)
+
+    def invalidate(self, url_json_path: str, *, store: str | None = None) -> None:
+        """
+        Evict everything cached for the item at `url_json_path`
+        """
+        item = self._item(url_json_path, store)
+        if item is not None:
+            self.__evict(item)
+
+    def invalidate_webhook(
+        self, topic: str, payload: Any, *, store: str | None = None
+    ) -> None:
+        """
+        Evict the items a webhook is about, see `webhook_items`.
+        """
+        for item in webhook_items(topic, payload):
+            self.__evict((store, *item))
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._generations.clear()
+        self._floor = next(self._counter)
+
+
+def freeze_params(params: dict[str, Any]) -> tuple:
+    """
+    A hashable, order independent form of request params
+    """
+    return tuple(sorted((k, str(v)) for k, v in params.items()))
+
+
+@dataclass(slots=True)
+class StoredResponse:
+    """
+    A response body with the validators to revalidate it.
+    """
+
+    etag: str | None
+    last_modified: str | None
+    content: bytes
+    content_type: str | None = None
+
+    @classmethod
+    def from_response(cls, resp: httpx.Response) -> "StoredResponse | None":
+        """
+        The response to store, or None when it has no validators.
+        """
+        etag = resp.headers.get("etag")
+        last_modified = resp.headers.get("last-modified")
+        if etag is None and last_modified is None:
+            return None
+        return cls(etag, last_modified, resp.content, resp.headers.get("content-type"))
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        """
+        The stored body as a fresh 200 response to `request`.
+        """
+        headers = {
+            name: value
+            for name, value in (
+                ("content-type", self.content_type),
+                ("etag", self.etag),
+                ("last-modified", self.last_modified),
+            )
+            if value is not None
+        }
+        return httpx.Response(
+            200, headers=headers, content=self.content, request=request
+        )
+
+
+def validator_key(
+    url_json_path: str, params: dict[str, Any], store: str | None = None
+) -> str:
+    path = url_json_path if store is None else f"{store}/{url_json_path}"
+    return f"{path}?{urlencode(freeze_params(params))}"
+
+
+class ValidatorStore:
+    """
+    Keeps the last `ETag`/`Last-Modified` response of GETs in memory,
+    for conditional requests. Unlike `ResponseCache` entries don't
+    expire, every use revalidates them with Shopify.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self._items = TTLCache(maxsize, float("inf"))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> StoredResponse | None:
+        return self._items.get(key)
+
+    def set(self, key: str, stored: StoredResponse) -> None:
+        self._items.set(key, stored)
+
+    def pop(self, key: str) -> None:
+        self._items.pop(key)
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteValidatorStore(ValidatorStore):
+    """
+    A `ValidatorStore` in a SQLite file, so it survives restarts.
+    It is small and quick, so it is used straight from the event loop,
+    from any thread.
+
+    Writes are committed at most every `commit_every` seconds and on
+    `close`, so a 200 doesn't wait for the disk. Validators lost in a
+    crash only cost a full GET.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS validators (
+        key TEXT PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        content BLOB NOT NULL,
+        content_type TEXT
+    );
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike = "shopipy-validators.sqlite3",
+        *,
+        commit_every: float = 1.0,
+    ) -> None:
+        # One `Shopify` can run on the `*_sync` methods' loop thread and
+        # on the caller's loop at once, so the connection is locked
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(self.SCHEMA)
+        self.commit_every = commit_every
+        self._lock = threading.Lock()
+        self._committed = time.monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM validators").fetchone()[0]
+
+    def get(self, key: str) -> StoredResponse | None:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT etag, last_modified, content, content_type FROM validators"
+                " WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return StoredResponse(*row) if row else None
+
+    def set(self, key: str, stored: StoredResponse) -> None:
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO validators VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    stored.etag,
+                    stored.last_modified,
+                    stored.content,
+                    stored.content_type,
+                ),
+            )
+            self.__commit_due()
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self.db.execute("DELETE FROM validators WHERE key = ?", (key,))
+            self.__commit_due()
+
+    def __commit_due(self) -> None:
+        now = time.monotonic()
+        if now - self._committed >= self.commit_every:
+            self.db.commit()
+            self._committed = now
+
+    def commit(self) -> None:
+        """
+        Commit the pending writes now
+        """
+        with self._lock:
+            self.db.commit()
+            self._committed = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            self.db.commit()
+            self.db.close()
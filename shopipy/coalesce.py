@@ -0,0 +1,145 @@
+import asyncio
+import copy
+
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time. Callers asking for a key already
+    in flight wait for that call and share its result.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = asyncio.ensure_future(fn())
+            call.add_done_callback(lambda _: self.__done(key, call))
+
+        # A cancelled caller must not cancel the call the others wait on
+        return await asyncio.shield(call)
+
+    def __done(self, key: Hashable, call: asyncio.Future) -> None:
+        # The key may have been forgotten and taken by a newer call
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def forget(self, match: Callable[[Any], bool]) -> None:
+        """
+        Stop sharing the calls whose key matches, e.g. because their result
+        is known to be stale. Callers already waiting still get it,
+        later callers start a new call.
+        """
+        for key in [key for key in self._calls if match(key)]:
+            del self._calls[key]
+
+
+def merge(base: dict, update: dict) -> dict:
+    """
+    Deep merge `update` into `base`, later values win. Lists are replaced.
+    """
+    for k, v in update.items():
+        if isinstance(v, dict) and isinstance(base.get(k), dict):
+            merge(base[k], v)
+        else:
+            base[k] = v
+    return base
+
+
+class _Pending:
+    __slots__ = ("data", "futures")
+
+    def __init__(self) -> None:
+        self.data: dict = {}
+        self.futures: list[asyncio.Future] = []
+
+
+class WriteBehind:
+    """
+    A write-behind queue for PUTs. Payloads for the same path submitted
+    within `window` seconds are merged into one request, and the merged
+    requests are sent with at most `max_concurrency` in flight.
+    Writes to the same path are sent in the order they were submitted.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, dict], Awaitable[T]],
+        *,
+        window: float = 0.5,
+        max_concurrency: int = 4,
+    ) -> None:
+        self.send = send
+        self.window = window
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending: dict[str, _Pending] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, path: str, data: dict) -> asyncio.Future:
+        """
+        Queue a write and return a future resolving to the result of the
+        request it ends up in.
+        """
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(path)
+        if pending is None:
+            pending = self._pending[path] = _Pending()
+            self._timers[path] = loop.call_later(self.window, self._flush, path)
+
+        merge(pending.data, copy.deepcopy(data))
+        future = loop.create_future()
+        pending.futures.append(future)
+        return future
+
+    def _flush(self, path: str) -> None:
+        pending = self._pending.pop(path, None)
+        if pending is None:
+            return
+        self._timers.pop(path).cancel()
+        previous = self._in_flight.get(path)
+        task = asyncio.ensure_future(self._write(path, pending, previous))
+        self._in_flight[path] = task
+        task.add_done_callback(
+            lambda t: (
+                self._in_flight.pop(path) if self._in_flight.get(path) is t else None
+            )
+        )
+
+    async def _write(
+        self, path: str, pending: _Pending, previous: asyncio.Task | None
+    ) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+
+        try:
+            async with self._semaphore:
+                result = await self.send(path, pending.data)
+        except Exception as e:
+            for future in pending.futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future in pending.futures:
+                if not future.done():
+                    future.set_result(result)
+
+    async def flush(self) -> None:
+        """
+        Send every queued write now and wait until all of them are done.
+        """
+        for path in list(self._pending):
+            self._flush(path)
+        if self._in_flight:
+            await asyncio.wait(list(self._in_flight.values()))
@@ -0,0 +1,145 @@
+import csv
+import dataclasses
+import gzip
+import json
+import os
+
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterable, TextIO
+
+
+def flatten(record: dict[str, Any], prefix: str = "", sep: str = ".") -> dict[str, Any]:
+    """
+    Flatten nested fields into one level, e.g. `billing_address.city` and
+    `shipping_lines.0.title`. Lists of plain values are kept as JSON.
+    """
+    flat: dict[str, Any] = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + sep, sep))
+        elif isinstance(value, list) and value and isinstance(value[0], dict):
+            for i, item in enumerate(value):
+                flat.update(flatten(item, f"{name}{sep}{i}{sep}", sep))
+        elif isinstance(value, list):
+            flat[name] = json.dumps(value)
+        else:
+            flat[name] = value
+    return flat
+
+
+def _as_dict(record: Any) -> dict[str, Any]:
+    return record if isinstance(record, dict) else dataclasses.asdict(record)
+
+
+class _Sink(ABC):
+    """
+    Base for the file sinks. Records are written as they come and the
+    file is flushed every `flush_every` records, so memory stays flat
+    and a partial export is usable.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        compress: bool | None = None,
+        flush_every: int = 1000,
+    ) -> None:
+        """
+        `compress` writes gzip, by default when `path` ends in `.gz`.
+        """
+        if compress is None:
+            compress = os.fspath(path).endswith(".gz")
+        self.file: TextIO = (
+            gzip.open(path, "wt", encoding="utf-8", newline="")
+            if compress
+            else open(path, "w", encoding="utf-8", newline="")
+        )
+        self.flush_every = flush_every
+        self.count = 0
+
+    @abstractmethod
+    def _write(self, record: dict[str, Any]) -> None:
+        """
+        Write one record, already a dict.
+        """
+
+    def write(self, record: dict | Any) -> None:
+        """
+        Write one record, an API dict or a model.
+        """
+        self._write(_as_dict(record))
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.file.flush()
+
+    async def consume(self, records: AsyncIterable[dict | Any]) -> int:
+        """
+        Write every record of a stream, e.g. `Shopify.iter_orders()`,
+        and return how many were written.
+        """
+        start = self.count
+        async for record in records:
+            self.write(record)
+        return self.count - start
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class NDJSONSink(_Sink):
+    """
+    Writes one JSON record per line, nested as it is or `flat`.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        flat: bool = False,
+        compress: bool | None = None,
+        flush_every: int = 1000,
+    ) -> None:
+        super().__init__(path, compress=compress, flush_every=flush_every)
+        self.flat = flat
+
+    def _write(self, record: dict[str, Any]) -> None:
+        if self.flat:
+            record = flatten(record)
+        self.file.write(json.dumps(record, separators=(",", ":")))
+        self.file.write("\n")
+
+
+class CSVSink(_Sink):
+    """
+    Writes flattened records as CSV. The columns are `columns`, or those
+    of the first record. Fields outside them are dropped.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        columns: list[str] | None = None,
+        compress: bool | None = None,
+        flush_every: int = 1000,
+    ) -> None:
+        super().__init__(path, compress=compress, flush_every=flush_every)
+        self.columns = columns
+        self._writer: csv.DictWriter | None = None
+
+    def _write(self, record: dict[str, Any]) -> None:
+        row = flatten(record)
+        if self._writer is None:
+            self._writer = csv.DictWriter(
+                self.file, self.columns or list(row), extrasaction="ignore"
+            )
+            self._writer.writeheader()
+        self._writer.writerow(row)
@@ -0,0 +1,203 @@
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Sequence
+
+try:
+    import numpy as np  # type: ignore[import-not-found]
+except ImportError:
+    np = None
+
+from .models import Order
+
+MONEY_COLUMNS = (
+    "total_price",
+    "subtotal_price",
+    "total_tax",
+    "total_discounts",
+    "current_total_price",
+    "current_total_tax",
+)
+TIME_COLUMNS = ("created_at", "updated_at", "processed_at", "cancelled_at")
+CATEGORY_COLUMNS = ("financial_status", "fulfillment_status", "currency")
+
+# Stands in for a missing timestamp
+NO_TIME = -(2**63)
+
+
+def parse_money(value: str | None, scale: int = 2) -> int:
+    """
+    Parse a money string like `"12.5"` into integer minor units (`1250`),
+    rounding half up past `scale` digits. A missing amount is 0.
+    """
+    if not value:
+        return 0
+
+    negative = value.startswith("-")
+    whole, _, fraction = value.lstrip("-").partition(".")
+    units = int(whole or 0) * 10**scale
+    if fraction:
+        units += int(fraction[:scale].ljust(scale, "0"))
+        if len(fraction) > scale and fraction[scale] >= "5":
+            units += 1
+    return -units if negative else units
+
+
+def parse_time(value: str | None) -> int:
+    """
+    Parse an ISO 8601 timestamp into epoch seconds.
+    """
+    if not value:
+        return NO_TIME
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def _getter(order: dict | Order) -> Callable[[str], Any]:
+    if isinstance(order, dict):
+        return order.get
+    return lambda name: getattr(order, name, None)
+
+
+class OrderFrame:
+    """
+    A columnar store of orders for reporting.
+
+    Ids are int64, money is int64 in minor units (cents with the default
+    `scale` of 2), timestamps are int64 epoch seconds and statuses are
+    int16 codes into a list of categories (-1 when missing). Columns are
+    `array.array`s, or NumPy arrays from `to_numpy` when it is installed.
+    Filters and group-by sums run on NumPy when it is available.
+    """
+
+    def __init__(self, scale: int = 2) -> None:
+        self.scale = scale
+        self.columns: dict[str, array] = {"id": array("q")}
+        for name in MONEY_COLUMNS + TIME_COLUMNS:
+            self.columns[name] = array("q")
+        for name in CATEGORY_COLUMNS:
+            self.columns[name] = array("h")
+        self.categories: dict[str, list[str]] = {n: [] for n in CATEGORY_COLUMNS}
+        self._codes: dict[str, dict[str, int]] = {n: {} for n in CATEGORY_COLUMNS}
+
+    @classmethod
+    def from_orders(
+        cls, orders: Iterable[dict | Order], scale: int = 2
+    ) -> "OrderFrame":
+        frame = cls(scale)
+        frame.extend(orders)
+        return frame
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __getitem__(self, name: str) -> array:
+        return self.columns[name]
+
+    def _code(self, column: str, value: str | None) -> int:
+        if value is None:
+            return -1
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self.categories[column].append(value)
+        return code
+
+    def extend(self, orders: Iterable[dict | Order]) -> None:
+        """
+        Add orders, as API dicts or `Order` models, e.g. a page at a time.
+        """
+        cols = self.columns
+        for order in orders:
+            get = _getter(order)
+            cols["id"].append(get("id") or 0)
+            for name in MONEY_COLUMNS:
+                cols[name].append(parse_money(get(name), self.scale))
+            for name in TIME_COLUMNS:
+                cols[name].append(parse_time(get(name)))
+            for name in CATEGORY_COLUMNS:
+                cols[name].append(self._code(name, get(name)))
+
+    def append(self, order: dict | Order) -> None:
+        self.extend((order,))
+
+    def _column(self, name: str) -> Any:
+        column = self.columns[name]
+        return np.frombuffer(column, dtype=column.typecode) if np else column
+
+    def eq(self, column: str, value: str) -> Sequence[bool]:
+        """
+        A mask of the rows where a category column equals `value`
+        """
+        code = self._codes[column].get(value, -2)
+        codes = self._column(column)
+        return codes == code if np else [c == code for c in codes]
+
+    def between(self, column: str, low: int, high: int) -> Sequence[bool]:
+        """
+        A mask of the rows where a numeric column is in `[low, high)`.
+        Timestamps are epoch seconds and money is in minor units.
+        """
+        values = self._column(column)
+        if np:
+            return (values >= low) & (values < high)
+        return [low <= v < high for v in values]
+
+    def filter(self, mask: Sequence[bool]) -> "OrderFrame":
+        """
+        A new frame with the rows where `mask` is true
+        """
+        frame = OrderFrame(self.scale)
+        frame.categories = {k: v[:] for k, v in self.categories.items()}
+        frame._codes = {k: dict(v) for k, v in self._codes.items()}
+        for name, column in self.columns.items():
+            if np:
+                selected = self._column(name)[np.asarray(mask, dtype=bool)]
+                frame.columns[name] = array(column.typecode, selected.tobytes())
+            else:
+                frame.columns[name] = array(
+                    column.typecode, (v for v, keep in zip(column, mask) if keep)
+                )
+        return frame
+
+    def group_sum(self, by: str, value: str) -> dict[Any, int]:
+        """
+        Sum a numeric column per value of a category column, or per
+        UTC day (as `YYYY-MM-DD`) of a timestamp column.
+        """
+        values = self._column(value)
+        keys = self._column(by)
+        if by in TIME_COLUMNS:
+            keys = keys // 86400 if np else array("q", (k // 86400 for k in keys))
+
+        def label(key: int) -> Any:
+            if by in TIME_COLUMNS:
+                if key == NO_TIME // 86400:
+                    return None
+                day = datetime.fromtimestamp(key * 86400, timezone.utc)
+                return day.strftime("%Y-%m-%d")
+            return self.categories[by][key] if key >= 0 else None
+
+        if np:
+            uniques, inverse = np.unique(keys, return_inverse=True)
+            sums = np.zeros(len(uniques), dtype=np.int64)
+            np.add.at(sums, inverse, values)
+            return {label(int(k)): int(s) for k, s in zip(uniques, sums)}
+
+        totals: dict[int, int] = {}
+        for k, v in zip(keys, values):
+            totals[k] = totals.get(k, 0) + v
+        return {label(k): s for k, s in sorted(totals.items())}
+
+    def daily_revenue(self, value: str = "total_price") -> dict[str, int]:
+        """
+        Revenue per UTC day of `created_at`, in minor units
+        """
+        return self.group_sum("created_at", value)
+
+    def to_numpy(self) -> dict[str, Any]:
+        """
+        A copy of the columns as NumPy arrays
+        """
+        if np is None:
+            raise ImportError("to_numpy requires numpy to be installed")
+        return {name: self._column(name).copy() for name in self.columns}
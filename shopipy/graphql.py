@@ -0,0 +1,70 @@
+from typing import Any
+
+from .ratelimit import LeakyBucket
+
+# What a query is assumed to cost before Shopify told us
+DEFAULT_COST = 50
+
+
+class GraphQLError(Exception):
+    """
+    The `errors` of a GraphQL response.
+    """
+
+    def __init__(self, errors: list[dict]) -> None:
+        super().__init__(errors)
+        self.errors = errors
+
+
+def point_bucket(maximum: int = 1000, restore_rate: float = 50.0) -> LeakyBucket:
+    """
+    A bucket for the GraphQL Admin API, where queries take points and
+    points restore at `restore_rate` per second (1000 and 50 on standard
+    stores, twice that on Plus). Both are corrected from responses.
+    """
+    bucket = LeakyBucket(maximum)
+    # Not passed as `leak_rate`, which would pin it
+    bucket.leak_rate = restore_rate
+    return bucket
+
+
+def is_throttled(errors: list[dict]) -> bool:
+    return any(e.get("extensions", {}).get("code") == "THROTTLED" for e in errors)
+
+
+def apply_cost(bucket: LeakyBucket, cost: dict[str, Any], estimate: float) -> None:
+    """
+    Sync `bucket` with the `extensions.cost` of a response to a query
+    that took `estimate` points in `acquire`.
+    """
+    actual = cost.get("actualQueryCost")
+    if actual is None:
+        # Not run, e.g. throttled, so nothing was spent
+        bucket.refund(estimate)
+    elif actual < estimate:
+        bucket.refund(estimate - actual)
+
+    status = cost.get("throttleStatus")
+    if status:
+        maximum = status["maximumAvailable"]
+        bucket.sync(
+            maximum - status["currentlyAvailable"],
+            maximum,
+            status["restoreRate"],
+        )
+
+
+def connection(data: dict, path: str) -> dict:
+    """
+    The connection at a dotted `path` of the data, e.g. `"orders"`
+    or `"customer.orders"`.
+    """
+    for key in path.split("."):
+        data = data[key]
+    return data
+
+
+def nodes(conn: dict) -> list[dict]:
+    if "nodes" in conn:
+        return conn["nodes"]
+    return [edge["node"] for edge in conn.get("edges", [])]
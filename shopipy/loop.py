@@ -0,0 +1,69 @@
+import asyncio
+import atexit
+import os
+import threading
+
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopThread:
+    """
+    An event loop running forever in a daemon thread.
+
+    The `*_sync` methods of `Shopify` submit their coroutines here
+    instead of calling `asyncio.run`, so the pooled `AsyncClient`
+    stays bound to a live loop and keeps its connections between calls.
+    `run` can be called from any number of threads at once.
+    """
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="shopipy-loop", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """
+        Run `coro` on the loop and block until it is done.
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Sync methods can't be called from the shopipy loop")
+
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def stop(self) -> None:
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+
+
+_lock = threading.Lock()
+_loop_thread: LoopThread | None = None
+_loop_pid: int | None = None
+
+
+def get_loop_thread() -> LoopThread:
+    """
+    The process wide loop thread, started on first use.
+    It is started again in a forked child, where the thread doesn't exist.
+    """
+    global _loop_thread, _loop_pid
+
+    if _loop_thread is not None and _loop_pid == os.getpid():
+        return _loop_thread
+
+    with _lock:
+        if _loop_thread is None or _loop_pid != os.getpid():
+            _loop_thread = LoopThread()
+            _loop_pid = os.getpid()
+        return _loop_thread
+
+
+@atexit.register
+def _shutdown() -> None:
+    if _loop_thread is not None and _loop_pid == os.getpid():
+        _loop_thread.stop()
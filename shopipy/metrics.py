@@ -0,0 +1,183 @@
+import bisect
+import re
+
+from dataclasses import dataclass
+
+_ID_SEGMENT = re.compile(r"(?<=/)\d+(?=/|\.json)")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass(slots=True)
+class RequestEvent:
+    """
+    What a hook gets for every `Shopify._request`. `latency` covers all
+    attempts, including rate limiter waits and retry backoff, and
+    `status` is None when the request failed without a response.
+    `queue_time` is the part of it spent waiting for the rate limiter
+    and scheduler in the request's `lane`.
+    """
+
+    method: str
+    endpoint: str
+    status: int | None
+    bytes: int
+    latency: float
+    retries: int
+    bucket_fill: float
+    lane: str = "normal"
+    queue_time: float = 0.0
+
+
+def endpoint_template(url_json_path: str) -> str:
+    """
+    The path with its ids replaced, e.g. `orders/{id}/fulfillments.json`
+    """
+    return _ID_SEGMENT.sub("{id}", "/" + url_json_path)[1:]
+
+
+class Histogram:
+    """
+    A cumulative histogram with fixed upper bounds, like Prometheus'.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by interpolating inside its bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                low = self.buckets[i - 1] if i else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class MetricsCollector:
+    """
+    An in memory request metrics hook. Pass it in `Shopify(hooks=[...])`
+    and read it with `summary` or `to_prometheus`.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.requests: dict[tuple[str, str, str], int] = {}
+        self.bytes: dict[tuple[str, str], int] = {}
+        self.retries: dict[tuple[str, str], int] = {}
+        self.queue_time: dict[str, Histogram] = {}
+        self.bucket_fill = 0.0
+
+    def __call__(self, event: RequestEvent) -> None:
+        key = (event.method.upper(), event.endpoint)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(self.buckets)
+        histogram.observe(event.latency)
+
+        queued = self.queue_time.get(event.lane)
+        if queued is None:
+            queued = self.queue_time[event.lane] = Histogram(self.buckets)
+        queued.observe(event.queue_time)
+
+        status = str(event.status) if event.status is not None else "error"
+        self.requests[key + (status,)] = self.requests.get(key + (status,), 0) + 1
+        self.bytes[key] = self.bytes.get(key, 0) + event.bytes
+        self.retries[key] = self.retries.get(key, 0) + event.retries
+        self.bucket_fill = event.bucket_fill
+
+    def summary(self) -> list[dict]:
+        """
+        One row per endpoint, the slowest first.
+        """
+        rows = [
+            {
+                "method": method,
+                "endpoint": endpoint,
+                "count": h.count,
+                "p50": h.quantile(0.5),
+                "p99": h.quantile(0.99),
+                "mean": h.sum / h.count,
+                "bytes": self.bytes[method, endpoint],
+                "retries": self.retries[method, endpoint],
+            }
+            for (method, endpoint), h in self.latency.items()
+        ]
+        return sorted(rows, key=lambda r: r["p99"], reverse=True)
+
+    def lanes(self) -> list[dict]:
+        """
+        The time requests waited to be sent, per priority lane.
+        """
+        return [
+            {
+                "lane": lane,
+                "count": h.count,
+                "p50": h.quantile(0.5),
+                "p99": h.quantile(0.99),
+                "mean": h.sum / h.count,
+            }
+            for lane, h in self.queue_time.items()
+        ]
+
+    def to_prometheus(self, prefix: str = "shopipy") -> str:
+        """
+        The metrics in the Prometheus text exposition format
+        """
+
+        def labels(**values: str) -> str:
+            return ",".join(f'{k}="{v}"' for k, v in values.items())
+
+        def histogram(name: str, base: str, h: Histogram) -> None:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), h.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{base},le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{base}}} {h.sum}")
+            lines.append(f"{name}_count{{{base}}} {h.count}")
+
+        duration = f"{prefix}_request_duration_seconds"
+        lines = [f"# TYPE {duration} histogram"]
+        for (method, endpoint), h in self.latency.items():
+            histogram(duration, labels(method=method, endpoint=endpoint), h)
+
+        queued = f"{prefix}_queue_duration_seconds"
+        lines.append(f"# TYPE {queued} histogram")
+        for lane, h in self.queue_time.items():
+            histogram(queued, labels(lane=lane), h)
+
+        lines.append(f"# TYPE {prefix}_requests_total counter")
+        for (method, endpoint, status), n in self.requests.items():
+            base = labels(method=method, endpoint=endpoint, status=status)
+            lines.append(f"{prefix}_requests_total{{{base}}} {n}")
+
+        lines.append(f"# TYPE {prefix}_response_bytes_total counter")
+        for (method, endpoint), n in self.bytes.items():
+            base = labels(method=method, endpoint=endpoint)
+            lines.append(f"{prefix}_response_bytes_total{{{base}}} {n}")
+
+        lines.append(f"# TYPE {prefix}_retries_total counter")
+        for (method, endpoint), n in self.retries.items():
+            base = labels(method=method, endpoint=endpoint)
+            lines.append(f"{prefix}_retries_total{{{base}}} {n}")
+
+        lines.append(f"# TYPE {prefix}_bucket_fill_ratio gauge")
+        lines.append(f"{prefix}_bucket_fill_ratio {self.bucket_fill}")
+        return "\n".join(lines) + "\n"
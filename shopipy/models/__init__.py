@@ -3,6 +3,7 @@ from .customer import Address, Customer
 from .fulfillment import Fulfillment
 from .product import Product
 from .webhook import Webhook
+from .decode import decode, decode_list
 
 
 __all__ = [
@@ -12,4 +13,6 @@ __all__ = [
     "Fulfillment",
     "Product",
     "Webhook",
+    "decode",
+    "decode_list",
 ]
@@ -0,0 +1,63 @@
+from typing import Any
+
+from .decode import decoder
+
+
+class _Lazy:
+    """
+    Stands in for the slot of a field that holds nested models. The raw
+    value is stored as it came from the API and built into models the
+    first time the field is read.
+    """
+
+    __slots__ = ("slot", "decode", "many")
+
+    def __init__(self, slot: Any, cls: type, many: bool) -> None:
+        self.slot = slot
+        self.decode = decoder(cls)
+        self.many = many
+
+    def _nested(self, value: Any) -> Any:
+        return self.decode(value) if isinstance(value, dict) else value
+
+    def __get__(self, obj: Any, owner: type | None = None) -> Any:
+        if obj is None:
+            return self
+
+        value = self.slot.__get__(obj, owner)
+        if not self.many:
+            if isinstance(value, dict):
+                value = self.decode(value)
+                self.slot.__set__(obj, value)
+        elif isinstance(value, list):
+            if value and isinstance(value[0], dict):
+                value = [self._nested(v) for v in value]
+                self.slot.__set__(obj, value)
+        elif isinstance(value, dict):
+            if value and isinstance(next(iter(value.values())), dict):
+                value = {k: self._nested(v) for k, v in value.items()}
+                self.slot.__set__(obj, value)
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        self.slot.__set__(obj, value)
+
+    def __delete__(self, obj: Any) -> None:
+        self.slot.__delete__(obj)
+
+
+def lazy(**fields: type | list[type]):
+    """
+    Class decorator for slotted dataclasses, making the given fields
+    build their nested models on first access. A class in a list,
+    e.g. `tax_lines=[TaxLine]`, marks a list (or dict) of models.
+    """
+
+    def wrap(cls: type) -> type:
+        for name, target in fields.items():
+            many = isinstance(target, list)
+            model = target[0] if isinstance(target, list) else target
+            setattr(cls, name, _Lazy(cls.__dict__[name], model, many))
+        return cls
+
+    return wrap
@@ -1,7 +1,8 @@
 from dataclasses import dataclass
+from .base import lazy
 
 
-@dataclass
+@dataclass(slots=True)
 class Address:
     address1: str
     address2: str | None
@@ -20,7 +21,8 @@ class Address:
     longitude: str | None
 
 
-@dataclass
+@lazy(default_address=Address, addresses=[Address])
+@dataclass(slots=True)
 class Customer:
     id: int
     email: str
@@ -41,8 +43,3 @@ class Customer:
     addresses: dict[str, str | Address]
     admin_graphql_api_id: str
     default_address: dict[str, str] | Address
-
-    def __post_init__(self):
-        self.default_address = Address(**self.default_address)
-        for k, address in self.addresses.items():
-            self.addresses[k] = Address(**address)
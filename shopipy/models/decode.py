@@ -0,0 +1,54 @@
+from dataclasses import MISSING, fields
+from typing import Any, Callable, Iterable
+
+_decoders: dict[type, Callable[[dict[str, Any]], Any]] = {}
+
+
+def _compile(cls: type) -> Callable[[dict[str, Any]], Any]:
+    namespace: dict[str, Any] = {"cls": cls}
+    args = []
+    for f in fields(cls):
+        if not f.init:
+            continue
+        if f.default is not MISSING:
+            namespace[f"default_{f.name}"] = f.default
+            args.append(f"get({f.name!r}, default_{f.name})")
+        elif f.default_factory is not MISSING:
+            namespace[f"factory_{f.name}"] = f.default_factory
+            args.append(
+                f"data[{f.name!r}] if {f.name!r} in data else factory_{f.name}()"
+            )
+        else:
+            args.append(f"get({f.name!r})")
+
+    source = "def decode(data):\n    get = data.get\n    return cls({})\n".format(
+        ", ".join(args)
+    )
+    exec(source, namespace)
+    return namespace["decode"]
+
+
+def decoder(cls: type) -> Callable[[dict[str, Any]], Any]:
+    """
+    The decoder of a model class: a function built once from the class'
+    fields that passes them positionally to the constructor. Unknown keys
+    are ignored and missing fields get their default, or None.
+    """
+    try:
+        return _decoders[cls]
+    except KeyError:
+        return _decoders.setdefault(cls, _compile(cls))
+
+
+def decode(cls: type, data: dict[str, Any]) -> Any:
+    """
+    Build a model from a raw API dict
+    """
+    return decoder(cls)(data)
+
+
+def decode_list(cls: type, items: Iterable[dict[str, Any]]) -> list[Any]:
+    """
+    Build a model from every raw dict in `items`
+    """
+    return list(map(decoder(cls), items))
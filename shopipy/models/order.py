@@ -2,9 +2,10 @@ from dataclasses import dataclass
 from typing import Any
 from .fulfillment import Fulfillment
 from .customer import Customer, Address
+from .base import lazy
 
 
-@dataclass
+@dataclass(slots=True)
 class ClientDetails:
     accept_language: str
     browser_height: int
@@ -14,37 +15,37 @@ class ClientDetails:
     user_agent: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Company:
     id: int
     location_id: int
 
 
-@dataclass
+@dataclass(slots=True)
 class CurrentTotalAdditionalFeesSet:
     shop_money: dict[str, str]
     presentment_money: dict[str, str]
 
 
-@dataclass
+@dataclass(slots=True)
 class CurrentTotalDiscountsSet:
     shop_money: dict[str, str]
     presentment_money: dict[str, str]
 
 
-@dataclass
+@dataclass(slots=True)
 class CurrentTotalDutiesSet:
     shop_money: dict[str, str]
     presentment_money: dict[str, str]
 
 
-@dataclass
+@dataclass(slots=True)
 class CurrentTotalPriceSet:
     shop_money: dict[str, str]
     presentment_money: dict[str, str]
 
 
-@dataclass
+@dataclass(slots=True)
 class DiscountApplication:
     type: str
     title: str
@@ -56,32 +57,32 @@ class DiscountApplication:
     target_type: str
 
 
-@dataclass
+@dataclass(slots=True)
 class DiscountCode:
     code: str
     amount: str
     type: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Location:
     id: int
     location_id: int
 
 
-@dataclass
+@dataclass(slots=True)
 class OriginalTotalAdditionalFeesSet:
     shop_money: dict[str, str]
     presentment_money: dict[str, str]
 
 
-@dataclass
+@dataclass(slots=True)
 class OriginalTotalDutiesSet:
     shop_money: dict[str, str]
     presentment_money: dict[str, str]
 
 
-@dataclass
+@dataclass(slots=True)
 class PaymentDetails:
     avs_result_code: str
     credit_card_bin: str
@@ -90,7 +91,7 @@ class PaymentDetails:
     credit_card_company: str
 
 
-@dataclass
+@dataclass(slots=True)
 class PaymentTerms:
     amount: int
     currency: str
@@ -100,7 +101,7 @@ class PaymentTerms:
     payment_schedules: list[dict[str, str]]
 
 
-@dataclass
+@dataclass(slots=True)
 class ShippingLine:
     code: str
     price: str
@@ -114,7 +115,7 @@ class ShippingLine:
     requested_fulfillment_service_id: str
 
 
-@dataclass
+@dataclass(slots=True)
 class TaxLine:
     price: str
     rate: float
@@ -122,7 +123,35 @@ class TaxLine:
     channel_liable: bool
 
 
-@dataclass
+@lazy(
+    billing_address=Address,
+    client_details=ClientDetails,
+    company=Company,
+    current_total_additional_fees_set=CurrentTotalAdditionalFeesSet,
+    current_total_discounts_set=CurrentTotalDiscountsSet,
+    current_total_duties_set=CurrentTotalDutiesSet,
+    current_total_price_set=CurrentTotalPriceSet,
+    current_subtotal_price_set=CurrentTotalPriceSet,
+    current_total_tax_set=CurrentTotalPriceSet,
+    customer=Customer,
+    discount_applications=[DiscountApplication],
+    discount_codes=[DiscountCode],
+    fulfillments=[Fulfillment],
+    original_total_additional_fees_set=OriginalTotalAdditionalFeesSet,
+    original_total_duties_set=OriginalTotalDutiesSet,
+    payment_details=PaymentDetails,
+    payment_terms=PaymentTerms,
+    shipping_address=Address,
+    shipping_lines=[ShippingLine],
+    subtotal_price_set=CurrentTotalPriceSet,
+    tax_lines=[TaxLine],
+    total_discounts_set=CurrentTotalDiscountsSet,
+    total_line_items_price_set=CurrentTotalPriceSet,
+    total_price_set=CurrentTotalPriceSet,
+    total_shipping_price_set=CurrentTotalPriceSet,
+    total_tax_set=CurrentTotalPriceSet,
+)
+@dataclass(slots=True)
 class Order:
     app_id: int
     billing_address: Address
@@ -207,42 +236,3 @@ class Order:
     updated_at: str
     user_id: int
     order_status_url: dict[str, str]
-
-    def __post_init__(self):
-        # Assign custom classes to specific fields
-        self.billing_address = Address(**self.billing_address)
-        self.client_details = ClientDetails(**self.client_details)
-        self.company = Company(**self.company)
-        self.current_total_additional_fees_set = CurrentTotalAdditionalFeesSet(
-            **self.current_total_additional_fees_set
-        )
-        self.current_total_discounts_set = CurrentTotalDiscountsSet(
-            **self.current_total_discounts_set
-        )
-        self.current_total_duties_set = CurrentTotalDutiesSet(
-            **self.current_total_duties_set
-        )
-        self.current_total_price_set = CurrentTotalPriceSet(
-            **self.current_total_price_set
-        )
-        self.customer = Customer(**self.customer)
-        self.discount_applications = DiscountApplication(**self.discount_applications)
-        self.original_total_additional_fees_set = OriginalTotalAdditionalFeesSet(
-            **self.original_total_additional_fees_set
-        )
-        self.original_total_duties_set = OriginalTotalDutiesSet(
-            **self.original_total_duties_set
-        )
-        self.payment_details = PaymentDetails(**self.payment_details)
-        self.payment_terms = PaymentTerms(**self.payment_terms)
-        self.shipping_address = Address(**self.shipping_address)
-        self.subtotal_price_set = CurrentTotalPriceSet(**self.subtotal_price_set)
-        self.total_discounts_set = CurrentTotalDiscountsSet(**self.total_discounts_set)
-        self.total_line_items_price_set = CurrentTotalPriceSet(
-            **self.total_line_items_price_set
-        )
-        self.total_price_set = CurrentTotalPriceSet(**self.total_price_set)
-        self.total_shipping_price_set = CurrentTotalPriceSet(
-            **self.total_shipping_price_set
-        )
-        self.total_tax_set = CurrentTotalPriceSet(**self.total_tax_set)
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Product:
     body_html: str | None
     created_at: str | None
@@ -21,7 +21,7 @@ class Product:
     vendor: str | None
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductImage:
     id: int
     product_id: int
@@ -34,7 +34,7 @@ class ProductImage:
     variant_ids: list[dict] | None
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductOption:
     id: int
     product_id: int
@@ -43,7 +43,7 @@ class ProductOption:
     values: list[str] | None
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductVariant:
     barcode: str | None
     compare_at_price: str | None
@@ -0,0 +1,184 @@
+import asyncio
+import time
+import weakref
+
+import httpx
+
+from typing import Any
+
+from .scheduler import FairScheduler
+from .shopify import Shopify
+
+# Options holding per store state, one object shared by every store would
+# mix their retry budgets, concurrency limits and cached responses
+PER_STORE_OPTIONS = {"cache", "retry_policy", "validators", "concurrency"}
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """
+    Lends the pool's transport to a store client. Closing the client
+    leaves the connections open for the other stores.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class ShopifyPool:
+    """
+    Many stores over one connection pool.
+
+    Every store gets its own `Shopify` instance, so its own rate limit
+    bucket, retries and cache, but they all send through one transport
+    and a `FairScheduler` that caps the requests in flight across stores
+    and serves the stores round robin.
+
+        pool = ShopifyPool()
+        pool.add("store-a", admin_key="...")
+        orders = await pool.get("store-a").get_orders()
+
+    Store instances that sent no request for `idle_timeout` seconds have
+    their client closed and are dropped. `get` hands back the same instance
+    while anyone still holds it, so a store never has two rate limit
+    buckets, and builds a new one from the registered options otherwise.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 100,
+        limits: httpx.Limits | None = None,
+        http2: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+        idle_timeout: float = 300.0,
+        **options: Any,
+    ) -> None:
+        """
+        `max_concurrency` caps the requests in flight across all stores.
+        `limits` and `http2` configure the shared transport, or pass one
+        as `transport`. It is closed with the pool.
+
+        Other `options` are passed to every `Shopify` instance, e.g.
+        `api_version` or `timeout`, and can be overridden per store in `add`.
+        Stateful options like `cache` or `retry_policy` can only be given
+        per store, in `add`.
+        """
+        shared = PER_STORE_OPTIONS.intersection(options)
+        if shared:
+            raise TypeError(
+                f"{', '.join(sorted(shared))} can't be shared by stores,"
+                " pass them per store to add()"
+            )
+        self.transport = transport or httpx.AsyncHTTPTransport(
+            limits=limits
+            or httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            http2=http2,
+        )
+        self.scheduler = FairScheduler(max_concurrency)
+        self.idle_timeout = idle_timeout
+        self.options = options
+        self._stores: dict[str, dict[str, Any]] = {}
+        self._clients: dict[str, Shopify] = {}
+        # Evicted instances, until their last holder lets go
+        self._evicted: weakref.WeakValueDictionary[str, Shopify] = (
+            weakref.WeakValueDictionary()
+        )
+        self._last_sweep = time.monotonic()
+        self._closing: set[asyncio.Task] = set()
+
+    def add(self, store_slug: str, admin_key: str, **options: Any) -> None:
+        """
+        Register a store. `options` override the pool's for this store.
+        """
+        if admin_key is None:
+            raise TypeError("Admin key can't be None")
+        self._stores[store_slug] = {**self.options, **options, "admin_key": admin_key}
+
+    def get(self, store_slug: str) -> Shopify:
+        """
+        The client of a registered store.
+        """
+        if store_slug not in self._stores:
+            raise AttributeError(f"Unknown store {store_slug!r}, add it first")
+
+        now = time.monotonic()
+        shopify = self._clients.get(store_slug)
+        if shopify is None:
+            shopify = self._evicted.pop(store_slug, None) or Shopify(
+                store_slug,
+                transport=_SharedTransport(self.transport),
+                scheduler=self.scheduler,
+                **self._stores[store_slug],
+            )
+            self._clients[store_slug] = shopify
+        shopify.last_used = now
+
+        if now - self._last_sweep >= self.idle_timeout / 2:
+            self._last_sweep = now
+            self.__sweep_later()
+        return shopify
+
+    async def remove(self, store_slug: str) -> None:
+        """
+        Close a store's client and forget the store.
+        """
+        self._stores.pop(store_slug, None)
+        self._evicted.pop(store_slug, None)
+        shopify = self._clients.pop(store_slug, None)
+        if shopify is not None:
+            await shopify.aclose()
+
+    def __contains__(self, store_slug: str) -> bool:
+        return store_slug in self._stores
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    async def evict_idle(self) -> int:
+        """
+        Close the clients idle for longer than `idle_timeout`,
+        and return how many were closed.
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        idle = [
+            slug
+            for slug, shopify in self._clients.items()
+            if shopify.last_used <= deadline and not shopify._in_flight
+        ]
+        for slug in idle:
+            shopify = self._clients.pop(slug)
+            self._evicted[slug] = shopify
+            await shopify.aclose()
+        return len(idle)
+
+    def __sweep_later(self) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(self.evict_idle())
+        except RuntimeError:
+            # No loop to sweep on, the next `get` will try again
+            return
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def aclose(self) -> None:
+        """
+        Close every store client, then the shared transport.
+        """
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(shopify.aclose() for shopify in clients))
+        await self.transport.aclose()
+
+    async def __aenter__(self) -> "ShopifyPool":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
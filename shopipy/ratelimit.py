@@ -0,0 +1,178 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+from typing import Mapping
+
+from .scheduler import Priority
+
+CALL_LIMIT_HEADER = "X-Shopify-Shop-Api-Call-Limit"
+
+
+class LeakyBucket:
+    """
+    A client side model of Shopify's REST leaky bucket.
+
+    Every request takes one slot from the bucket and the bucket leaks
+    at a fixed rate. Requests wait in `acquire` until a slot is free,
+    so the client runs right at the limit instead of hitting 429s.
+    The bucket is corrected from the `X-Shopify-Shop-Api-Call-Limit`
+    header on every response.
+
+    Waiting requests are served by `Priority`, and `BATCH` requests leave
+    `batch_reserve` of the bucket free, so interactive requests find room
+    even while a bulk job keeps the bucket full.
+
+    A request can take more than one slot, which models the GraphQL
+    bucket, where a query costs points and the bucket restores points.
+    """
+
+    def __init__(
+        self,
+        capacity: float = 40,
+        leak_rate: float | None = None,
+        batch_reserve: float = 0.1,
+    ) -> None:
+        """
+        `capacity` is the bucket size (40 on standard stores, 400 on Plus).
+        `leak_rate` is in requests per second. When it is not given it is
+        derived from the capacity, since Shopify drains a full bucket in 20s.
+        `batch_reserve` is the share of the capacity `BATCH` requests can't use.
+        """
+        self.capacity = float(capacity)
+        self._fixed_rate = leak_rate
+        self.leak_rate = leak_rate if leak_rate is not None else capacity / 20
+        self.batch_reserve = batch_reserve
+        self._level = 0.0
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def level(self) -> float:
+        """
+        The current fill of the bucket, after leaking.
+        """
+        self._leak()
+        return self._level
+
+    @property
+    def fill(self) -> float:
+        """
+        The bucket fill as a fraction of its capacity.
+        """
+        return self.level / self.capacity
+
+    def _leak(self) -> None:
+        now = time.monotonic()
+        self._level = max(0.0, self._level - (now - self._updated) * self.leak_rate)
+        self._updated = now
+
+    def _limit(self, priority: int) -> float:
+        if priority >= Priority.BATCH:
+            return max(1.0, self.capacity * (1 - self.batch_reserve))
+        return self.capacity
+
+    async def acquire(self, priority: int = Priority.NORMAL, cost: float = 1) -> None:
+        """
+        Wait until the bucket has room and take `cost` slots.
+        A cost above the capacity waits for an empty bucket.
+        """
+        self._leak()
+        if not self._waiters and self._level + cost <= self._limit(priority):
+            self._level += cost
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), cost, waiter))
+        self.__serve()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slots were taken for us, give them back
+                self.refund(cost)
+            self.__serve()
+            raise
+
+    def refund(self, cost: float) -> None:
+        """
+        Give back slots taken by `acquire`, e.g. when a query cost
+        less than estimated.
+        """
+        self._leak()
+        self._level = max(0.0, self._level - cost)
+        if self._waiters:
+            self.__serve()
+
+    def __serve(self) -> None:
+        """
+        Grant slots to the waiters in priority order while there is room,
+        then sleep until the first one in line fits.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        waiters = self._waiters
+        self._leak()
+        while waiters:
+            priority, _, cost, waiter = waiters[0]
+            if waiter.done():
+                heapq.heappop(waiters)
+                continue
+            limit = self._limit(priority)
+            needed = self._level + min(cost, limit) - limit
+            if needed > 0:
+                loop = waiter.get_loop()
+                self._timer = loop.call_later(needed / self.leak_rate, self.__serve)
+                return
+            heapq.heappop(waiters)
+            self._level += cost
+            waiter.set_result(None)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Sync the bucket with the call limit header of a response.
+
+        Responses can arrive out of order, and the local level already
+        counts requests still in flight, so the server value only ever
+        raises the level.
+        """
+        value = headers.get(CALL_LIMIT_HEADER)
+        if value is None:
+            return
+
+        try:
+            used, capacity = (int(v) for v in value.split("/"))
+        except ValueError:
+            return
+        self.sync(used, capacity)
+
+    def sync(
+        self, used: float, capacity: float, leak_rate: float | None = None
+    ) -> None:
+        """
+        Sync the bucket with the state reported by the server. The leak
+        rate is derived from the capacity when not given or fixed.
+        """
+        self._leak()
+        if leak_rate is not None and self._fixed_rate is None:
+            self.leak_rate = leak_rate
+        if capacity != self.capacity:
+            self.capacity = capacity
+            if leak_rate is None and self._fixed_rate is None:
+                self.leak_rate = capacity / 20
+
+        self._level = max(self._level, float(used))
+        if self._waiters:
+            self.__serve()
+
+    def saturate(self) -> None:
+        """
+        Mark the bucket as full, e.g. after a 429.
+        """
+        self._leak()
+        self._level = float(self.capacity)
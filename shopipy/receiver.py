@@ -0,0 +1,202 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Mapping
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class WebhookEvent:
+    topic: str
+    shop_domain: str | None
+    webhook_id: str | None
+    api_version: str | None
+    payload: Any
+    headers: dict[str, str]
+
+
+Handler = Callable[[WebhookEvent], Awaitable[Any]]
+
+
+class WebhookReceiver:
+    """
+    An ASGI app receiving Shopify webhooks.
+
+    Deliveries are verified against `X-Shopify-Hmac-Sha256`, deduplicated
+    on `X-Shopify-Webhook-Id`, queued and acknowledged straight away.
+    A fixed pool of workers runs the handlers, so slow handlers never make
+    Shopify time out and redeliver. When the queue stays full for
+    `enqueue_timeout` seconds the delivery is refused with a 503 and
+    Shopify retries it later.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        handler: Handler | None = None,
+        *,
+        workers: int = 8,
+        queue_size: int = 1000,
+        enqueue_timeout: float = 2.0,
+        dedupe_size: int = 10_000,
+        dedupe_ttl: float = 3600.0,
+        invalidate: Callable[[str, Any], Any] | None = None,
+    ) -> None:
+        """
+        `secret` is the app's client secret the deliveries are signed with.
+        `handler` gets every topic without a handler of its own, see `on`.
+        `invalidate` is called with the topic and payload of every new
+        delivery before it is queued, e.g. `Shopify.invalidate_webhook`.
+        """
+        self.secret = secret.encode()
+        self.default_handler = handler
+        self.handlers: dict[str, Handler] = {}
+        self.workers = workers
+        self.enqueue_timeout = enqueue_timeout
+        self.invalidate = invalidate
+        self.seen = TTLCache(dedupe_size, dedupe_ttl)
+        self._queue_size = queue_size
+        self._queue: asyncio.Queue[WebhookEvent] | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def on(self, topic: str) -> Callable[[Handler], Handler]:
+        """
+        Register a handler for a topic, e.g. `@receiver.on("orders/create")`
+        """
+
+        def register(handler: Handler) -> Handler:
+            self.handlers[topic] = handler
+            return handler
+
+        return register
+
+    def verify(self, body: bytes, hmac_header: str | None) -> bool:
+        """
+        Check the signature of a delivery, in constant time.
+        """
+        if not hmac_header:
+            return False
+        digest = hmac.new(self.secret, body, hashlib.sha256).digest()
+        return hmac.compare_digest(base64.b64encode(digest), hmac_header.encode())
+
+    async def start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(self._queue_size)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """
+        Wait for the queued deliveries to be handled, then stop the workers.
+        """
+        if self._queue is None:
+            return
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._queue = None
+        self._tasks = []
+
+    async def _work(self) -> None:
+        assert self._queue is not None
+        while True:
+            event = await self._queue.get()
+            try:
+                handler = self.handlers.get(event.topic, self.default_handler)
+                if handler is not None:
+                    await handler(event)
+            except Exception:
+                logger.exception("Webhook handler failed for %s", event.topic)
+            finally:
+                self._queue.task_done()
+
+    async def dispatch(self, body: bytes, headers: Mapping[str, str]) -> int:
+        """
+        Verify and queue one delivery, returning the HTTP status to answer.
+        `headers` must have lower case names. Use this to mount the receiver
+        in frameworks that aren't ASGI.
+        """
+        if not self.verify(body, headers.get("x-shopify-hmac-sha256")):
+            return 401
+
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            return 400
+
+        webhook_id = headers.get("x-shopify-webhook-id")
+        if webhook_id is not None and not self.seen.add(webhook_id):
+            return 200
+
+        event = WebhookEvent(
+            topic=headers.get("x-shopify-topic", ""),
+            shop_domain=headers.get("x-shopify-shop-domain"),
+            webhook_id=webhook_id,
+            api_version=headers.get("x-shopify-api-version"),
+            payload=payload,
+            headers=dict(headers),
+        )
+        if self.invalidate is not None:
+            # The id is already marked seen, a failure here must not drop the event
+            try:
+                self.invalidate(event.topic, payload)
+            except Exception:
+                logger.exception("Invalidating for webhook %s failed", webhook_id)
+
+        await self.start()
+        assert self._queue is not None
+        try:
+            await asyncio.wait_for(self._queue.put(event), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            # Let the redelivery through
+            if webhook_id is not None:
+                self.seen.pop(webhook_id)
+            return 503
+
+        return 200
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        if scope["type"] != "http":
+            return
+
+        if scope["method"] != "POST":
+            status = 405
+        else:
+            body = b""
+            more_body = True
+            while more_body:
+                message = await receive()
+                body += message.get("body", b"")
+                more_body = message.get("more_body", False)
+
+            headers = {
+                k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]
+            }
+            status = await self.dispatch(body, headers)
+
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -0,0 +1,91 @@
+import random
+
+from dataclasses import dataclass, field
+
+import httpx
+
+
+@dataclass
+class RetryPolicy:
+    """
+    When and how `Shopify._request` retries a failed request.
+
+    Only idempotent methods are retried on 5xx responses and transport
+    errors. A 429 or a connection that was never established means the
+    request was not processed, so those are retried for every method.
+
+    Retries draw from a budget that starts at `budget_min` and grows by
+    `budget_ratio` for every request sent, up to `budget_max`. Once it is
+    spent a degraded store can add at most that fraction on top of the
+    normal request volume.
+    """
+
+    max_attempts: int = 4
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    methods: frozenset[str] = frozenset({"get", "put", "delete"})
+    statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    budget_ratio: float = 0.2
+    budget_min: int = 10
+    budget_max: int = 50
+    _tokens: float = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._tokens = float(self.budget_min)
+
+    def record_request(self) -> None:
+        """
+        Add to the retry budget for a newly sent request.
+        """
+        self._tokens = min(self.budget_max, self._tokens + self.budget_ratio)
+
+    def _withdraw(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+        *,
+        response: httpx.Response | None = None,
+        error: Exception | None = None,
+    ) -> bool:
+        """
+        Whether a request that failed on `attempt` (starting at 1)
+        should be sent again. Takes from the budget when it says yes.
+        """
+        if attempt >= self.max_attempts:
+            return False
+
+        idempotent = method.lower() in self.methods
+        if response is not None:
+            if response.status_code not in self.statuses:
+                return False
+            if response.status_code != 429 and not idempotent:
+                return False
+        elif isinstance(error, httpx.ConnectError):
+            pass
+        elif not (isinstance(error, httpx.TransportError) and idempotent):
+            return False
+
+        return self._withdraw()
+
+    def delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """
+        Seconds to wait before the next attempt. A `Retry-After` header
+        wins, otherwise it is exponential backoff with full jitter.
+        """
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is not None:
+                try:
+                    return max(0.0, float(retry_after))
+                except ValueError:
+                    pass
+
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        )
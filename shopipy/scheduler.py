@@ -0,0 +1,98 @@
+import asyncio
+import heapq
+import itertools
+
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Hashable
+
+
+class Priority(IntEnum):
+    """
+    Request lanes, the most urgent first. Waiting requests of a lane are
+    served before those of the lanes below it.
+    """
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BATCH = 2
+
+
+class FairScheduler:
+    """
+    Caps the requests in flight across many stores and hands out free
+    slots round robin between the stores that are waiting, so a store
+    with a deep backlog can't starve the others. Within a store, waiters
+    are served by `Priority`.
+    """
+
+    def __init__(self, max_concurrency: int = 100) -> None:
+        if max_concurrency < 1:
+            raise AttributeError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        # Insertion order is the round robin order
+        self._waiters: dict[Hashable, list[tuple[int, int, asyncio.Future]]] = {}
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self._waiters.values())
+
+    async def acquire(self, key: Hashable, priority: int = Priority.NORMAL) -> None:
+        """
+        Wait for a slot on behalf of `key`, e.g. a store slug.
+        """
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters.setdefault(key, []), (priority, next(self._seq), waiter)
+        )
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted right before the cancellation, pass it on
+                self.release()
+            else:
+                self.__discard(key, waiter)
+            raise
+
+    def release(self) -> None:
+        self.active -= 1
+        self.__wake()
+
+    @asynccontextmanager
+    async def slot(
+        self, key: Hashable, priority: int = Priority.NORMAL
+    ) -> AsyncIterator[None]:
+        await self.acquire(key, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def __discard(self, key: Hashable, waiter: asyncio.Future) -> None:
+        queue = self._waiters.get(key)
+        if queue is None:
+            return
+        queue[:] = [entry for entry in queue if entry[2] is not waiter]
+        heapq.heapify(queue)
+        if not queue:
+            del self._waiters[key]
+
+    def __wake(self) -> None:
+        while self.active < self.max_concurrency and self._waiters:
+            key = next(iter(self._waiters))
+            queue = self._waiters.pop(key)
+            _, _, waiter = heapq.heappop(queue)
+            if queue:
+                # Back of the line until every other store had a turn
+                self._waiters[key] = queue
+            if waiter.done():
+                continue
+            self.active += 1
+            waiter.set_result(None)
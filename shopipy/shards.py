@@ -0,0 +1,168 @@
+import asyncio
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator
+
+from .models import Order
+from .models.decode import decoder
+from .shopify import RequestType, ReturnMode, Shopify
+
+_DONE = object()
+
+
+@dataclass(slots=True)
+class Shard:
+    start: datetime
+    end: datetime
+    count: int
+
+
+def _as_datetime(value: datetime | str) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+class ShardedOrderExport:
+    """
+    Export the orders created in a time range by splitting it into shards
+    and paginating the shards concurrently.
+
+    Shards are sized with `orders/count.json`: a window is halved until
+    it holds at most `shard_size` orders. All shards share the rate limit
+    of the `Shopify` instance.
+    """
+
+    def __init__(
+        self,
+        shopify: Shopify,
+        *,
+        shard_size: int = 2500,
+        max_concurrency: int = 4,
+        limit: int = 250,
+        min_window: timedelta = timedelta(minutes=1),
+    ) -> None:
+        """
+        `max_concurrency` is the number of shards paginated at once.
+        Windows shorter than `min_window` are not split any further.
+        """
+        self.shopify = shopify
+        self.shard_size = shard_size
+        self.max_concurrency = max_concurrency
+        self.limit = limit
+        self.min_window = min_window
+
+    async def count(self, start: datetime, end: datetime, **params) -> int:
+        resp = await self.shopify._request(
+            "orders/count.json",
+            RequestType.GET,
+            created_at_min=start.isoformat(),
+            created_at_max=end.isoformat(),
+            **params,
+        )
+        resp.raise_for_status()
+        return resp.json()["count"]
+
+    async def plan(
+        self, start: datetime | str, end: datetime | str, **params
+    ) -> list[Shard]:
+        """
+        Split the range into shards, in chronological order.
+        Both ends are inclusive, like Shopify's `created_at_min/max`.
+        """
+        start, end = _as_datetime(start), _as_datetime(end)
+        return await self._split(
+            start, end, await self.count(start, end, **params), params
+        )
+
+    async def _split(
+        self, start: datetime, end: datetime, count: int, params: dict
+    ) -> list[Shard]:
+        if count == 0:
+            return []
+        if count <= self.shard_size or end - start <= self.min_window:
+            return [Shard(start, end, count)]
+
+        # Timestamps have second resolution, the halves must not overlap
+        mid = start + (end - start) / 2
+        mid = mid.replace(microsecond=0)
+        left_count = await self.count(start, mid, **params)
+        halves = await asyncio.gather(
+            self._split(start, mid, left_count, params),
+            self._split(mid + timedelta(seconds=1), end, count - left_count, params),
+        )
+        return halves[0] + halves[1]
+
+    async def _produce(
+        self,
+        shard: Shard,
+        queue: asyncio.Queue,
+        semaphore: asyncio.Semaphore,
+        params: dict,
+    ) -> None:
+        try:
+            async with semaphore:
+                async for items, _ in self.shopify._iter_pages(
+                    url_json_path="orders.json",
+                    key="orders",
+                    limit=self.limit,
+                    created_at_min=shard.start.isoformat(),
+                    created_at_max=shard.end.isoformat(),
+                    order="created_at asc",
+                    **params,
+                ):
+                    await queue.put(items)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await queue.put(_DONE)
+
+    async def export(
+        self,
+        start: datetime | str,
+        end: datetime | str,
+        *,
+        ordered: bool = False,
+        return_mode: ReturnMode = ReturnMode.DICT,
+        fields: list[str] | str | None = None,
+        **params: Any,
+    ) -> AsyncIterator[dict | Order]:
+        """
+        Yield every order created between `start` and `end`.
+
+        Unordered, orders are yielded as soon as any shard returns them.
+        With `ordered`, they come in `created_at` order, and shards ahead
+        of the one being read buffer at most two pages each.
+        """
+        params.setdefault("status", "any")
+        shards = await self.plan(start, end, **params)
+        decode_item = decoder(Order)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Each queue is read until all of its producers are done
+        if ordered:
+            queues: list[asyncio.Queue[Any]] = [asyncio.Queue(2) for _ in shards]
+            reads = [(queue, 1) for queue in queues]
+        else:
+            shared: asyncio.Queue[Any] = asyncio.Queue(self.max_concurrency * 2)
+            queues = [shared for _ in shards]
+            reads = [(shared, len(shards))]
+
+        page_params = {**params, "fields": fields} if fields is not None else params
+        tasks = [
+            asyncio.create_task(self._produce(shard, queue, semaphore, page_params))
+            for shard, queue in zip(shards, queues)
+        ]
+        try:
+            for queue, producers in reads:
+                while producers:
+                    page = await queue.get()
+                    if page is _DONE:
+                        producers -= 1
+                        continue
+                    if isinstance(page, Exception):
+                        raise page
+                    for o in page:
+                        yield decode_item(o) if return_mode == ReturnMode.MODEL else o
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -1,13 +1,47 @@
-from asyncio.tasks import _FutureLike
 import os
 import asyncio
+import logging
+import time
 import httpx
 
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from httpx import AsyncClient
 from enum import Enum, StrEnum
-from typing import Any, Callable, Literal
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Literal
 
 from .models import *
+from .models.decode import decoder
+from .adaptive import AdaptiveConcurrency
+from .cache import (
+    ResponseCache,
+    StoredResponse,
+    ValidatorStore,
+    freeze_params,
+    item_key,
+    validator_key,
+    webhook_items,
+)
+from .coalesce import SingleFlight, WriteBehind
+from .graphql import (
+    DEFAULT_COST,
+    GraphQLError,
+    apply_cost,
+    connection,
+    is_throttled,
+    nodes,
+    point_bucket,
+)
+from .loop import get_loop_thread
+from .metrics import RequestEvent, endpoint_template
+from .ratelimit import LeakyBucket
+from .retry import RetryPolicy
+from .scheduler import FairScheduler, Priority
+
+logger = logging.getLogger(__name__)
+
+_priority: ContextVar[Priority] = ContextVar("priority", default=Priority.NORMAL)
 
 
 class RequestType(StrEnum):
@@ -22,6 +56,33 @@ class ReturnMode(Enum):
     MODEL = 1
 
 
+def _with_fields(params: dict, fields: list[str] | str | None) -> dict:
+    """
+    Add the `fields` projection to request params
+    """
+    if fields is None:
+        return params
+    return {**params, "fields": fields if isinstance(fields, str) else ",".join(fields)}
+
+
+@dataclass(slots=True)
+class _LoopState:
+    """
+    What a `Shopify` instance keeps per event loop: the connection pool,
+    the requests in flight and the GETs shared by callers on that loop.
+    """
+
+    client: AsyncClient
+    idle: asyncio.Event = field(default_factory=asyncio.Event)
+    in_flight: int = 0
+    flights: SingleFlight = field(default_factory=SingleFlight)
+
+    async def aclose(self) -> None:
+        if self.in_flight:
+            await self.idle.wait()
+        await self.client.aclose()
+
+
 class Shopify:
     """The Main class for the Api. This will be the entry point for our SDK"""
 
@@ -31,6 +92,19 @@ class Shopify:
         *,
         admin_key=os.environ.get("SHOPIFY_ADMIN_KEY", None),
         api_version="2023-07",
+        bucket_size: int = 40,
+        retry_policy: RetryPolicy | None = None,
+        limits: httpx.Limits | None = None,
+        timeout: httpx.Timeout | float = 10.0,
+        http2: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache: ResponseCache | None = None,
+        write_window: float = 0.5,
+        write_concurrency: int = 4,
+        hooks: Iterable[Callable[[RequestEvent], Any]] | None = None,
+        scheduler: FairScheduler | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        validators: ValidatorStore | None = None,
     ) -> None:
         """
         The API requires a authorized Admin key,
@@ -38,27 +112,262 @@ class Shopify:
         via the App dev panel if your are creating a standalone app.
 
         Otherwise it requires Oauth flow.
+
+        `bucket_size` is the REST leaky bucket size of the store
+        (400 on Plus stores). It is corrected from the response headers.
+
+        `retry_policy` controls retries of failed requests, pass
+        `RetryPolicy(max_attempts=1)` to turn them off.
+
+        `limits`, `timeout`, `http2` and `transport` configure the pooled
+        `AsyncClient`. `http2` needs the `httpx[http2]` extra installed.
+        Use the instance as an async context manager, or call `aclose`,
+        to close the pool when done. The `*_sync` methods and every other
+        loop awaiting the async ones get a pool of their own, but share
+        the rate limit bucket, so don't send from two loops at once.
+
+        `cache` turns on caching of single resource GETs,
+        e.g. `get_products(product_id=...)`. Edits and deletes through
+        this instance evict the item, for changes made elsewhere
+        pass webhooks to `invalidate_webhook`.
+
+        `write_window` and `write_concurrency` configure the write-behind
+        queue of the `queue_edit_*` methods.
+
+        `hooks` are called with a `RequestEvent` after every request,
+        e.g. a `metrics.MetricsCollector`.
+
+        `scheduler` shares a cap on requests in flight with other stores,
+        see `pool.ShopifyPool`.
+
+        `concurrency` tunes the limit of `bulk_request(max_concurrency="auto")`.
+
+        `validators` turns on conditional GETs: responses with an `ETag`
+        or `Last-Modified` are stored, and repeating the GET sends
+        `If-None-Match`/`If-Modified-Since`. On a 304 the stored body is
+        served. Pass a `cache.SQLiteValidatorStore` to keep them on disk.
         """
 
         if admin_key is None:
             raise TypeError("Admin key can't be None")
+        self.store_slug = store_slug
         self.__url = f"https://{store_slug}.myshopify.com/admin/api/{api_version}"
         self.__headers = {"X-Shopify-Access-Token": admin_key}
-        self._client: AsyncClient | None = None
+        self._loops: dict[asyncio.AbstractEventLoop, _LoopState] = {}
+        self._client_options: dict[str, Any] = {
+            "limits": limits
+            or httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            "timeout": timeout,
+            "http2": http2,
+            "transport": transport,
+        }
+        self._in_flight = 0
+        # `time.monotonic()` of the last request, e.g. for idle eviction
+        self.last_used = time.monotonic()
+        self.bucket = LeakyBucket(bucket_size)
+        self.graphql_bucket = point_bucket()
+        self._graphql_costs: dict[str, float] = {}
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        self.validators = validators
+        self.hooks = list(hooks or [])
+        self.scheduler = scheduler
+        self.concurrency = concurrency or AdaptiveConcurrency()
+        self._write_window = write_window
+        self._write_concurrency = write_concurrency
+        self._write_queue: WriteBehind | None = None
+
+    @property
+    def client(self) -> AsyncClient:
+        """
+        The client of the running loop
+        """
+        return self.__loop_state().client
+
+    def __loop_state(self) -> _LoopState:
+        # Connections are bound to the loop they were opened on, so the
+        # `*_sync` methods' loop thread and every caller's loop get a client
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            # Nothing can be closed on a closed loop anymore
+            for closed in [other for other in list(self._loops) if other.is_closed()]:
+                self._loops.pop(closed, None)
+            state = _LoopState(
+                AsyncClient(headers=self.__headers, **self._client_options)
+            )
+            self._loops[loop] = state
+        return state
+
+    async def aclose(self) -> None:
+        """
+        Send queued edits and wait for requests in flight to finish,
+        then close the connection pools.
+        """
+        await self.flush_edits()
+
+        current = asyncio.get_running_loop()
+        for loop in list(self._loops):
+            state = self._loops.pop(loop, None)
+            if state is None or loop.is_closed():
+                continue
+            if loop is current:
+                await state.aclose()
+                continue
+            # Closed on its own loop, without waiting for it as it may be
+            # blocked on this one
+            closing = state.aclose()
+            try:
+                asyncio.run_coroutine_threadsafe(closing, loop)
+            except RuntimeError:
+                # It closed in the meantime
+                closing.close()
 
     @property
-    def client(self, **kwargs) -> AsyncClient:
-        if self._client is None:
-            self._client = AsyncClient(headers=self.__headers, **kwargs)
-        return self._client
+    def write_queue(self) -> WriteBehind:
+        if self._write_queue is None:
+            self._write_queue = WriteBehind(
+                self.__write,
+                window=self._write_window,
+                max_concurrency=self._write_concurrency,
+            )
+        return self._write_queue
+
+    async def __write(self, url_json_path: str, data: dict) -> dict:
+        resp = await self._edit_item(url_json_path=url_json_path, json=data)
+        return resp.json()
+
+    async def flush_edits(self) -> None:
+        """
+        Send the edits queued by the `queue_edit_*` methods now
+        """
+        if self._write_queue is not None:
+            await self._write_queue.flush()
+
+    def close(self) -> None:
+        """
+        Sync version of `aclose`
+        """
+        self._run_sync(self.aclose())
+
+    async def __aenter__(self) -> "Shopify":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    @staticmethod
+    @contextmanager
+    def priority(priority: Priority) -> Iterator[None]:
+        """
+        Send the requests made in the block, and in tasks started in it,
+        in the lane of `priority`. Waiting requests are served by lane:
+
+            with shopify.priority(Priority.INTERACTIVE):
+                orders = await shopify.get_orders(order_id=order_id)
+        """
+        token = _priority.set(Priority(priority))
+        try:
+            yield
+        finally:
+            _priority.reset(token)
+
+    def _run_sync(self, coro):
+        """
+        Run a coroutine on the shared background loop for the `*_sync` methods.
+        """
+        return get_loop_thread().run(coro)
+
+    async def bulk_request(
+        self,
+        requests_list: Iterable[dict],
+        *,
+        max_concurrency: int | Literal["auto"] | None = None,
+        priority: Priority = Priority.BATCH,
+    ) -> list[httpx.Response]:
+        """
+        Send many requests at once. Every dict holds the kwargs of `_request`.
+        Responses are returned in the order of `requests_list`.
 
-    async def bulk_request(self, requests_list: list[dict]):
+        `max_concurrency` caps the requests in flight, with `"auto"` the cap
+        follows `concurrency`, which adapts it to the store's latency and
+        rate limit. They are sent in the `BATCH` lane by default, behind
+        other requests to the store.
+        """
+        if max_concurrency is None:
+            with self.priority(priority):
+                tasks = [
+                    asyncio.ensure_future(self._request(**req)) for req in requests_list
+                ]
+            return await asyncio.gather(*tasks)
+
+        requests_list = list(requests_list)
+        responses: list[httpx.Response] = [None] * len(requests_list)  # type: ignore
+
+        async for i, _, resp in self.__iter_bulk(
+            requests_list, max_concurrency, priority
+        ):
+            responses[i] = resp
+        return responses
+
+    async def iter_bulk_request(
+        self,
+        requests_list: Iterable[dict],
+        *,
+        max_concurrency: int | Literal["auto"] = 10,
+        priority: Priority = Priority.BATCH,
+    ) -> AsyncIterator[tuple[dict, httpx.Response]]:
+        """
+        Like `bulk_request`, but yields `(request, response)` pairs
+        as soon as each request finishes.
 
-        tasks: list[_FutureLike] = [
-            asyncio.create_task(self._request(**req)) for req in requests_list
-        ]
+        `requests_list` is consumed lazily, so a generator keeps memory
+        flat no matter how many requests are sent.
+        """
+        async for _, req, resp in self.__iter_bulk(
+            requests_list, max_concurrency, priority
+        ):
+            yield req, resp
 
-        return await asyncio.gather(*tasks)
+    async def __iter_bulk(
+        self,
+        requests_list: Iterable[dict],
+        max_concurrency: int | Literal["auto"],
+        priority: Priority,
+    ) -> AsyncIterator[tuple[int, dict, httpx.Response]]:
+        fixed_limit: int | None = None
+        if max_concurrency != "auto":
+            fixed_limit = max_concurrency
+            if fixed_limit < 1:
+                raise AttributeError("max_concurrency must be at least 1 or 'auto'")
+
+        requests_iter = enumerate(requests_list)
+        pending: dict[asyncio.Task, tuple[int, dict]] = {}
+
+        def schedule() -> None:
+            limit = self.concurrency.current if fixed_limit is None else fixed_limit
+            # Tasks take the lane from the context they are created in
+            with self.priority(priority):
+                while len(pending) < limit:
+                    try:
+                        i, req = next(requests_iter)
+                    except StopIteration:
+                        return
+                    pending[asyncio.create_task(self._request(**req))] = (i, req)
+
+        schedule()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    i, req = pending.pop(task)
+                    yield i, req, task.result()
+                schedule()
+        finally:
+            for task in pending:
+                task.cancel()
 
     async def _request(
         self,
@@ -66,38 +375,348 @@ class Shopify:
         method: str,
         *,
         json: dict[Any, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        bucket: LeakyBucket | None = None,
+        cost: float = 1,
         **params,
     ) -> httpx.Response:
+        """
+        Send a request with extra `headers`. It takes `cost` slots from
+        `bucket`, by default one from the REST bucket.
+        """
         url = "{}/{}".format(self.__url, url_json_path)
-
-        return await self.client.request(
-            method,
-            url,
-            json=json,
-            params=params,
+        priority = _priority.get()
+        bucket = bucket or self.bucket
+
+        event = RequestEvent(
+            method=method.upper(),
+            endpoint=endpoint_template(url_json_path),
+            status=None,
+            bytes=0,
+            latency=0.0,
+            retries=0,
+            bucket_fill=0.0,
+            lane=priority.name.lower(),
         )
+        start = time.perf_counter()
+        ticket = self.concurrency.start()
+        self.last_used = time.monotonic()
+
+        state = self.__loop_state()
+        self._in_flight += 1
+        state.in_flight += 1
+        state.idle.clear()
+        try:
+            resp = await self.__send(
+                method,
+                url,
+                json=json,
+                params=params,
+                headers=headers,
+                priority=priority,
+                bucket=bucket,
+                cost=cost,
+                event=event,
+            )
+            event.status = resp.status_code
+            event.bytes = len(resp.content)
+            return resp
+        finally:
+            event.latency = time.perf_counter() - start
+            event.bucket_fill = bucket.fill
+            self.concurrency.record(ticket, event, in_flight=self._in_flight)
+            self._in_flight -= 1
+            state.in_flight -= 1
+            if not state.in_flight:
+                state.idle.set()
+            if self.hooks:
+                self.__emit(event)
+
+    def __emit(self, event: RequestEvent) -> None:
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.exception("Request hook %r failed", hook)
+
+    async def __send(
+        self,
+        method: str,
+        url: str,
+        *,
+        json: dict | None,
+        params: dict,
+        headers: dict[str, str] | None,
+        priority: Priority,
+        bucket: LeakyBucket,
+        cost: float,
+        event: RequestEvent,
+    ) -> httpx.Response:
+        """
+        Send a request through the rate limiter, retrying it per `retry_policy`
+        """
+        self.retry_policy.record_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            event.retries = attempt - 1
+            queued = time.perf_counter()
+            await bucket.acquire(priority, cost)
+            try:
+                if self.scheduler is None:
+                    event.queue_time += time.perf_counter() - queued
+                    resp = await self.client.request(
+                        method, url, json=json, params=params, headers=headers
+                    )
+                else:
+                    async with self.scheduler.slot(self.store_slug, priority):
+                        event.queue_time += time.perf_counter() - queued
+                        resp = await self.client.request(
+                            method, url, json=json, params=params, headers=headers
+                        )
+            except httpx.TransportError as e:
+                if not self.retry_policy.should_retry(method, attempt, error=e):
+                    raise
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+                continue
+
+            bucket.update(resp.headers)
+            if resp.status_code == 429:
+                bucket.saturate()
+
+            if not self.retry_policy.should_retry(method, attempt, response=resp):
+                return resp
+            await asyncio.sleep(self.retry_policy.delay(attempt, resp))
+
+    async def graphql(self, query: str, variables: dict | None = None) -> dict:
+        """
+        Run a GraphQL Admin API query and return its `data`.
+
+        Queries are rate limited by points on `graphql_bucket`, which is
+        synced from `extensions.cost` of every response. A query is assumed
+        to cost what it was charged last time, and throttled queries are
+        retried once the bucket has restored enough points.
+        Raises `GraphQLError` when the response has `errors`.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            estimate = self._graphql_costs.get(query, DEFAULT_COST)
+            resp = await self._request(
+                "graphql.json",
+                RequestType.CREATE,
+                json={"query": query, "variables": variables or {}},
+                bucket=self.graphql_bucket,
+                cost=estimate,
+            )
+            resp.raise_for_status()
+
+            body = resp.json()
+            cost = body.get("extensions", {}).get("cost")
+            if cost:
+                self._graphql_costs[query] = cost["requestedQueryCost"]
+                apply_cost(self.graphql_bucket, cost, estimate)
+
+            errors = body.get("errors")
+            if not errors:
+                return body["data"]
+            if is_throttled(errors) and attempt < self.retry_policy.max_attempts:
+                continue
+            raise GraphQLError(errors)
+
+    async def iter_graphql(
+        self,
+        query: str,
+        path: str,
+        variables: dict | None = None,
+        *,
+        cursor: str | None = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Yield the nodes of the connection at `path` in the query's data,
+        page by page. The query takes the cursor as `$after` and selects
+        `pageInfo { hasNextPage endCursor }` on the connection, e.g.
+
+            query($after: String) {
+              orders(first: 100, after: $after) {
+                nodes { id name lineItems(first: 50) { nodes { sku quantity } } }
+                pageInfo { hasNextPage endCursor }
+              }
+            }
+
+        with `path="orders"`. `cursor` resumes after a saved `endCursor`.
+        """
+        variables = dict(variables or {})
+        while True:
+            variables["after"] = cursor
+            conn = connection(await self.graphql(query, variables), path)
+            for node in nodes(conn):
+                yield node
+
+            page_info = conn["pageInfo"]
+            if not page_info["hasNextPage"]:
+                return
+            cursor = page_info["endCursor"]
 
     async def __get_item(
         self,
         *,
         url_json_path: str,
         limit: int = 50,
+        fields: list[str] | str | None = None,
         **params,
     ) -> httpx.Response:
         """
-        The generic function to get items
+        The generic function to get items.
+        `fields` limits the response to the given attributes.
         """
         if limit > 250:
             raise AttributeError("The max limit is 250")
 
-        params = {**params, "limit": limit}
+        params = _with_fields({**params, "limit": limit}, fields)
+        generation = None
+        if self.cache is not None:
+            cached = self.cache.get(url_json_path, params, store=self.store_slug)
+            if cached is not None:
+                return cached
+
+            generation = self.cache.generation(url_json_path, store=self.store_slug)
+
+        # Identical GETs in flight at the same time share one request
+        resp = await self.__loop_state().flights.do(
+            (url_json_path, freeze_params(params)),
+            lambda: self.__conditional_get(url_json_path, params),
+        )
+
+        if self.cache is not None and resp.status_code == 200:
+            self.cache.set(
+                url_json_path, params, resp, generation, store=self.store_slug
+            )
+        return resp
+
+    async def __conditional_get(
+        self, url_json_path: str, params: dict
+    ) -> httpx.Response:
+        """
+        A GET revalidating the stored response, when `validators` is set
+        """
+        if self.validators is None:
+            return await self._request(
+                method=RequestType.GET, url_json_path=url_json_path, **params
+            )
+
+        key = validator_key(url_json_path, params, self.store_slug)
+        stored = self.validators.get(key)
         resp = await self._request(
             method=RequestType.GET,
             url_json_path=url_json_path,
+            headers=stored.conditional_headers() if stored else None,
             **params,
         )
+
+        if resp.status_code == 304 and stored is not None:
+            return stored.to_response(resp.request)
+        if resp.status_code == 200:
+            fresh = StoredResponse.from_response(resp)
+            if fresh is not None:
+                self.validators.set(key, fresh)
+            elif stored is not None:
+                self.validators.pop(key)
         return resp
 
+    def invalidate_webhook(self, topic: str, payload: Any) -> None:
+        """
+        Evict the cached item a webhook is about. Pass it as the
+        `invalidate` hook of a `WebhookReceiver`.
+        """
+        if self.cache is not None:
+            self.cache.invalidate_webhook(topic, payload, store=self.store_slug)
+        self.__forget_flights(webhook_items(topic, payload))
+
+    def __invalidate(self, url_json_path: str) -> None:
+        """
+        Evict an item after changing it, from the cache and from the GETs
+        in flight, whose responses may predate the change.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(url_json_path, store=self.store_slug)
+        item = item_key(url_json_path)
+        if item is not None:
+            self.__forget_flights([item])
+
+    def __forget_flights(self, items: list[tuple[str, str]]) -> None:
+        if not items:
+            return
+        for state in list(self._loops.values()):
+            if len(state.flights):
+                state.flights.forget(lambda key: item_key(key[0]) in items)
+
+    async def _iter_pages(
+        self,
+        *,
+        url_json_path: str,
+        key: str,
+        limit: int = 250,
+        page_info: str | None = None,
+        fields: list[str] | str | None = None,
+        **params,
+    ) -> AsyncIterator[tuple[list[dict], str | None]]:
+        """
+        Walk a list endpoint by following the `page_info` cursor of the
+        `Link` header. Yields `(items, next_page_info)` for every page.
+
+        The next page is requested before the current one is yielded,
+        so the network round trip overlaps with the caller's work.
+        Passing `page_info` resumes a walk from that cursor.
+        `fields` limits the records to the given attributes.
+        """
+        if limit > 250:
+            raise AttributeError("The max limit is 250")
+
+        params = _with_fields(params, fields)
+
+        async def fetch(cursor: str | None) -> httpx.Response:
+            if cursor is None:
+                page_params = {**params, "limit": limit}
+            else:
+                # Shopify rejects filters alongside a cursor, only fields may stay
+                page_params = {"limit": limit, "page_info": cursor}
+                if "fields" in params:
+                    page_params["fields"] = params["fields"]
+
+            return await self._request(url_json_path, RequestType.GET, **page_params)
+
+        next_page: asyncio.Task[httpx.Response] | None = asyncio.create_task(
+            fetch(page_info)
+        )
+        try:
+            while next_page is not None:
+                resp = await next_page
+                resp.raise_for_status()
+                next_link = resp.links.get("next")
+                cursor = (
+                    httpx.URL(next_link["url"]).params.get("page_info")
+                    if next_link
+                    else None
+                )
+                next_page = asyncio.create_task(fetch(cursor)) if cursor else None
+                yield resp.json()[key], cursor
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def _iter_items(
+        self, *, url_json_path: str, key: str, limit: int = 250, **params
+    ) -> AsyncIterator[dict]:
+        """
+        Yield every record of a list endpoint, one at a time.
+        """
+        async for items, _ in self._iter_pages(
+            url_json_path=url_json_path, key=key, limit=limit, **params
+        ):
+            for item in items:
+                yield item
+
     async def __create_items(
         self, *, url_json_path: str, data: dict[Any, Any], **params
     ) -> httpx.Response:
@@ -119,7 +738,9 @@ class Shopify:
         json_path = (
             f"{url_json_path}/{item_id}.json" if item_id is not None else url_json_path
         )
-        return await self._request(url_json_path, RequestType.DELETE)
+        resp = await self._request(json_path, RequestType.DELETE)
+        self.__invalidate(json_path)
+        return resp
 
     async def _edit_item(
         self,
@@ -132,7 +753,9 @@ class Shopify:
         json_path = (
             f"{url_json_path}/{item_id}.json" if item_id is not None else url_json_path
         )
-        return await self._request(url_json_path, RequestType.EDIT, json=json)
+        resp = await self._request(json_path, RequestType.EDIT, json=json)
+        self.__invalidate(json_path)
+        return resp
 
     async def get_orders(
         self,
@@ -140,22 +763,30 @@ class Shopify:
         *,
         order_id: str | int | None = None,
         return_mode: ReturnMode = ReturnMode.DICT,
+        fields: list[str] | str | None = None,
         **params,
     ) -> list[dict | Order]:
         """
         The method to get orders
+
+        `fields` limits the orders to the given attributes, e.g.
+        `["id", "updated_at"]`. Models get None for the rest.
         """
 
         json_path = "orders.json"
         if order_id is not None:
             json_path = f"orders/{order_id}.json"
 
-        orders = await self.__get_item(url_json_path=json_path, limit=limit, **params)
+        resp = await self.__get_item(
+            url_json_path=json_path, limit=limit, fields=fields, **params
+        )
 
-        if return_mode == 1:
-            return [Order(o) for o in orders.json()["Orders"]]
+        data = resp.json()
+        orders = data["orders"] if order_id is None else [data["order"]]
+        if return_mode == ReturnMode.MODEL:
+            return decode_list(Order, orders)
 
-        return orders.json()["orders"]
+        return orders
 
     def get_orders_sync(
         self,
@@ -163,27 +794,58 @@ class Shopify:
         *,
         order_id: str | int | None = None,
         return_mode: ReturnMode = ReturnMode.DICT,
+        fields: list[str] | str | None = None,
         **params,
     ) -> list[dict | Order]:
         """
         Synchronus vesion of `get_orders`
         """
-        return asyncio.run(
+        return self._run_sync(
             self.get_orders(
                 limit,
                 return_mode=return_mode,
                 order_id=order_id,
+                fields=fields,
                 **params,
             )
         )
 
+    async def iter_orders(
+        self,
+        limit: int = 250,
+        *,
+        return_mode: ReturnMode = ReturnMode.DICT,
+        fields: list[str] | str | None = None,
+        **params,
+    ) -> AsyncIterator[dict | Order]:
+        """
+        Iterate over every order, following the pagination cursor
+        """
+        decode_item = decoder(Order)
+        async for o in self._iter_items(
+            url_json_path="orders.json",
+            key="orders",
+            limit=limit,
+            fields=fields,
+            **params,
+        ):
+            yield decode_item(o) if return_mode == ReturnMode.MODEL else o
+
     async def edit_order(self, order_id: int, data: dict[Any, Any]) -> dict:
         json_path = f"orders/{order_id}.json"
         resp = await self._edit_item(url_json_path=json_path, json=data)
         return resp.json()
 
     def edit_order_sync(self, order_id: int, data: dict) -> dict:
-        return asyncio.run(self.edit_order(order_id=order_id, data=data))
+        return self._run_sync(self.edit_order(order_id=order_id, data=data))
+
+    def queue_edit_order(self, order_id: int, data: dict[Any, Any]) -> asyncio.Future:
+        """
+        Queue an edit of a order. Edits of the same order queued within
+        `write_window` are merged into one request. The future resolves
+        to the response of that request.
+        """
+        return self.write_queue.submit(f"orders/{order_id}.json", data)
 
     async def delete_order(self, order_id: int) -> dict:
         json_path = f"orders/{order_id}.json"
@@ -191,48 +853,83 @@ class Shopify:
         return resp.json()
 
     def delete_order_sync(self, order_id: int, data: dict) -> dict:
-        return asyncio.run(self.delete_order(order_id=order_id))
+        return self._run_sync(self.delete_order(order_id=order_id))
 
     async def get_products(
         self,
         limit=50,
         *,
         return_mode=ReturnMode.DICT,
-        product_id: int | str | None,
+        product_id: int | str | None = None,
+        fields: list[str] | str | None = None,
         **params,
     ) -> list[dict | Product]:
         """
         Get products from the api,
+
+        `fields` limits the products to the given attributes, e.g.
+        `["id", "updated_at"]`. Models get None for the rest.
         """
 
         if product_id is None:
             json_path = "products.json"
         else:
             json_path = f"products/{product_id}.json"
-        limit = None
 
-        products = await self.__get_item(url_json_path=json_path, limit=limit)
+        resp = await self.__get_item(
+            url_json_path=json_path, limit=limit, fields=fields, **params
+        )
 
-        if return_mode == 1:
-            return [Product(**p) for p in products.json()["products"]]
+        data = resp.json()
+        products = data["products"] if product_id is None else [data["product"]]
+        if return_mode == ReturnMode.MODEL:
+            return decode_list(Product, products)
 
-        return products.json()["products"]
+        return products
 
     def get_products_sync(
-        self, limit=50, *, product_id=None, return_mode=ReturnMode.DICT, **params
+        self,
+        limit=50,
+        *,
+        product_id=None,
+        return_mode=ReturnMode.DICT,
+        fields: list[str] | str | None = None,
+        **params,
     ) -> list[dict | Product]:
         """
         Sync version of `get_products`
         """
-        return asyncio.run(
+        return self._run_sync(
             self.get_products(
                 limit,
                 return_mode=return_mode,
                 product_id=product_id,
+                fields=fields,
                 **params,
             ),
         )
 
+    async def iter_products(
+        self,
+        limit: int = 250,
+        *,
+        return_mode: ReturnMode = ReturnMode.DICT,
+        fields: list[str] | str | None = None,
+        **params,
+    ) -> AsyncIterator[dict | Product]:
+        """
+        Iterate over every product, following the pagination cursor
+        """
+        decode_item = decoder(Product)
+        async for p in self._iter_items(
+            url_json_path="products.json",
+            key="products",
+            limit=limit,
+            fields=fields,
+            **params,
+        ):
+            yield decode_item(p) if return_mode == ReturnMode.MODEL else p
+
     async def create_product(self, data: dict[Any, Any]) -> dict:
         """
         Create a product
@@ -249,7 +946,7 @@ class Shopify:
         """
         Sync version of `create_product`
         """
-        return asyncio.run(self.create_product(data))
+        return self._run_sync(self.create_product(data))
 
     async def edit_product(self, product_id: int, data: dict[Any, Any]) -> dict:
         json_path = f"products/{product_id}.json"
@@ -257,7 +954,17 @@ class Shopify:
         return resp.json()
 
     def edit_product_sync(self, product_id: int, data: dict) -> dict:
-        return asyncio.run(self.edit_product(product_id=product_id, data=data))
+        return self._run_sync(self.edit_product(product_id=product_id, data=data))
+
+    def queue_edit_product(
+        self, product_id: int, data: dict[Any, Any]
+    ) -> asyncio.Future:
+        """
+        Queue an edit of a product. Edits of the same product queued within
+        `write_window` are merged into one request. The future resolves
+        to the response of that request.
+        """
+        return self.write_queue.submit(f"products/{product_id}.json", data)
 
     async def delete_product(self, product_id: int) -> dict:
         json_path = f"products/{product_id}.json"
@@ -265,7 +972,7 @@ class Shopify:
         return resp.json()
 
     def delete_product_sync(self, product_id: int, data: dict) -> dict:
-        return asyncio.run(self.delete_product(product_id=product_id))
+        return self._run_sync(self.delete_product(product_id=product_id))
 
     async def get_customers(
         self,
@@ -273,22 +980,30 @@ class Shopify:
         *,
         return_mode=ReturnMode.DICT,
         customer_id: int | str | None = None,
+        fields: list[str] | str | None = None,
         **params,
     ) -> list[dict | Customer]:
         """
         Get Customer info.
+
+        `fields` limits the customers to the given attributes, e.g.
+        `["id", "updated_at"]`. Models get None for the rest.
         """
         if customer_id is None:
             json_path = "customers.json"
         else:
             json_path = f"customers/{customer_id}.json"
 
-        resp = await self.__get_item(url_json_path=json_path, limit=limit, **params)
+        resp = await self.__get_item(
+            url_json_path=json_path, limit=limit, fields=fields, **params
+        )
 
-        if return_mode == 1:
-            return [Customer(**c) for c in resp.json()["customers"]]
+        data = resp.json()
+        customers = data["customers"] if customer_id is None else [data["customer"]]
+        if return_mode == ReturnMode.MODEL:
+            return decode_list(Customer, customers)
 
-        return resp.json()["customers"]
+        return customers
 
     def get_customers_sync(
         self,
@@ -296,20 +1011,43 @@ class Shopify:
         *,
         customer_id=None,
         return_mode: ReturnMode = ReturnMode.DICT,
+        fields: list[str] | str | None = None,
         **params,
     ) -> list[dict | Customer]:
         """
         Sync version of getting customers.
         """
-        return asyncio.run(
+        return self._run_sync(
             self.get_customers(
                 limit,
                 return_mode=return_mode,
                 customer_id=customer_id,
+                fields=fields,
                 **params,
             )
         )
 
+    async def iter_customers(
+        self,
+        limit: int = 250,
+        *,
+        return_mode: ReturnMode = ReturnMode.DICT,
+        fields: list[str] | str | None = None,
+        **params,
+    ) -> AsyncIterator[dict | Customer]:
+        """
+        Iterate over every customer, following the pagination cursor
+        """
+        decode_item = decoder(Customer)
+        async for c in self._iter_items(
+            url_json_path="customers.json",
+            key="customers",
+            limit=limit,
+            fields=fields,
+            **params,
+        ):
+            yield decode_item(c) if return_mode == ReturnMode.MODEL else c
+
     async def create_customer(self, customer_data: dict) -> dict:
 
         resp = await self.__create_items(
@@ -318,7 +1056,7 @@ class Shopify:
         return resp.json()
 
     def create_customer_sync(self, customer_data: dict) -> dict:
-        resp_data = asyncio.run(self.create_customer(customer_data=customer_data))
+        resp_data = self._run_sync(self.create_customer(customer_data=customer_data))
 
         return resp_data
 
@@ -328,7 +1066,17 @@ class Shopify:
         return resp.json()
 
     def edit_customer_sync(self, customer_id: int, data: dict) -> dict:
-        return asyncio.run(self.edit_customer(customer_id=customer_id, data=data))
+        return self._run_sync(self.edit_customer(customer_id=customer_id, data=data))
+
+    def queue_edit_customer(
+        self, customer_id: int, data: dict[Any, Any]
+    ) -> asyncio.Future:
+        """
+        Queue an edit of a customer. Edits of the same customer queued within
+        `write_window` are merged into one request. The future resolves
+        to the response of that request.
+        """
+        return self.write_queue.submit(f"customers/{customer_id}.json", data)
 
     async def delete_customer(self, customer_id: int) -> dict:
         json_path = f"customers/{customer_id}.json"
@@ -336,7 +1084,7 @@ class Shopify:
         return resp.json()
 
     def delete_customer_sync(self, customer_id: int, data: dict) -> dict:
-        return asyncio.run(self.delete_customer(customer_id=customer_id))
+        return self._run_sync(self.delete_customer(customer_id=customer_id))
 
     async def get_webhooks(
         self,
@@ -356,11 +1104,11 @@ class Shopify:
         resp = await self.__get_item(url_json_path=json_path, limit=50, **params)
 
         resp_data = resp.json()
-        if return_mode == 1:
+        if return_mode == ReturnMode.MODEL:
             return (
-                [Webhook(w) for w in resp_data["webhooks"]]
+                decode_list(Webhook, resp_data["webhooks"])
                 if webhook_id is None
-                else Webhook(resp_data["webhook"])
+                else decode(Webhook, resp_data["webhook"])
             )
         return resp_data["webhooks"] if webhook_id is None else resp_data["webhook"]
 
@@ -372,7 +1120,7 @@ class Shopify:
         return_mode: ReturnMode = ReturnMode.DICT,
         **params,
     ) -> dict | list[dict] | Webhook | list[Webhook]:
-        return asyncio.run(
+        return self._run_sync(
             self.get_webhooks(
                 limit=limit,
                 webhook_id=webhook_id,
@@ -381,6 +1129,22 @@ class Shopify:
             )
         )
 
+    async def iter_webhooks(
+        self,
+        limit: int = 250,
+        *,
+        return_mode: ReturnMode = ReturnMode.DICT,
+        **params,
+    ) -> AsyncIterator[dict | Webhook]:
+        """
+        Iterate over every webhook, following the pagination cursor
+        """
+        decode_item = decoder(Webhook)
+        async for w in self._iter_items(
+            url_json_path="webhooks.json", key="webhooks", limit=limit, **params
+        ):
+            yield decode_item(w) if return_mode == ReturnMode.MODEL else w
+
     async def create_webhook(
         self, topic: str, address: str, format: str = "json"
     ) -> dict:
@@ -396,7 +1160,7 @@ class Shopify:
         return resp.json()
 
     def edit_webhook_sync(self, webhook_id: int, data: dict) -> dict:
-        return asyncio.run(self.edit_webhook(webhook_id=webhook_id, data=data))
+        return self._run_sync(self.edit_webhook(webhook_id=webhook_id, data=data))
 
     async def delete_webhook(self, webhook_id: int) -> dict:
         json_path = f"webhooks/{webhook_id}.json"
@@ -404,7 +1168,7 @@ class Shopify:
         return resp.json()
 
     def delete_webhook_sync(self, webhook_id: int, data: dict) -> dict:
-        return asyncio.run(self.delete_webhook(webhook_id=webhook_id))
+        return self._run_sync(self.delete_webhook(webhook_id=webhook_id))
 
     async def get_fulfillments(
         self,
@@ -412,6 +1176,7 @@ class Shopify:
         *,
         fullfilment_id: str | int | None = None,
         return_mode: ReturnMode = ReturnMode.DICT,
+        fields: list[str] | str | None = None,
         params: dict = {},
         **kwargs,
     ) -> list[dict | Fulfillment] | Fulfillment | dict:
@@ -419,6 +1184,7 @@ class Shopify:
         A method to get fulfillments or an individual fulfillment.
         Invidual fulfillments require an order_id to be passed as a kwarg.
         Unlike other get methods, url params need to passed off as a dict.
+        `fields` limits the fulfillments to the given attributes.
 
         TODO: Fetch fulfillment from a FulFillmentOrder
         """
@@ -437,13 +1203,15 @@ class Shopify:
         else:
             json_path = f"orders/{oid}/fulfillments/{fullfilment_id}.json"
 
-        resp = await self.__get_item(url_json_path=json_path, limit=limit, **params)
+        resp = await self.__get_item(
+            url_json_path=json_path, limit=limit, fields=fields, **params
+        )
 
-        if return_mode == 1:
+        if return_mode == ReturnMode.MODEL:
             if fullfilment_id:
-                return Fulfillment(resp.json()["fulfillment"])
-            return [Fulfillment(f) for f in resp.json()["fulfillments"]]
-        elif fullfilment_id is None:
+                return decode(Fulfillment, resp.json()["fulfillment"])
+            return decode_list(Fulfillment, resp.json()["fulfillments"])
+        elif fullfilment_id is not None:
             return resp.json()["fulfillment"]
 
         return resp.json()["fulfillments"]
@@ -454,19 +1222,49 @@ class Shopify:
         *,
         fullfilment_id: str | int | None = None,
         return_mode: ReturnMode = ReturnMode.DICT,
+        fields: list[str] | str | None = None,
         params: dict = {},
         **kwargs,
     ) -> list[dict | Fulfillment] | Fulfillment | dict:
-        return asyncio.run(
+        return self._run_sync(
             self.get_fulfillments(
                 limit,
                 fullfilment_id=fullfilment_id,
                 params=params,
                 return_mode=return_mode,
+                fields=fields,
                 **kwargs,
             )
         )
 
+    async def iter_fulfillments(
+        self,
+        limit: int = 250,
+        *,
+        order_id: str | int | None = None,
+        return_mode: ReturnMode = ReturnMode.DICT,
+        fields: list[str] | str | None = None,
+        **params,
+    ) -> AsyncIterator[dict | Fulfillment]:
+        """
+        Iterate over every fulfillment, or the fulfillments of one order,
+        following the pagination cursor
+        """
+        json_path = (
+            "fulfillments.json"
+            if order_id is None
+            else f"orders/{order_id}/fulfillments.json"
+        )
+        decode_item = decoder(Fulfillment)
+        async for f in self._iter_items(
+            url_json_path=json_path,
+            key="fulfillments",
+            limit=limit,
+            fields=fields,
+            **params,
+        ):
+            yield decode_item(f) if return_mode == ReturnMode.MODEL else f
+
     async def create_fulfillment(
         self,
         fulfillment_order_id: int,
@@ -510,7 +1308,7 @@ class Shopify:
         tracking_url: str | None = None,
         other_data: dict | None = None,
     ) -> dict:
-        return asyncio.run(
+        return self._run_sync(
             self.create_fulfillment(
                 fulfillment_order_id=fulfillment_order_id,
                 tracking_number=tracking_number,
@@ -526,7 +1324,7 @@ class Shopify:
         return resp.json()
 
     def edit_fulfillment_sync(self, fulfillment_id: int, data: dict) -> dict:
-        return asyncio.run(
+        return self._run_sync(
             self.edit_fulfillment(fulfillment_id=fulfillment_id, data=data)
         )
 
@@ -536,4 +1334,4 @@ class Shopify:
         return resp.json()
 
     def delete_fulfillment_sync(self, fulfillment_id: int, data: dict) -> dict:
-        return asyncio.run(self.delete_fulfillment(fulfillment_id=fulfillment_id))
+        return self._run_sync(self.delete_fulfillment(fulfillment_id=fulfillment_id))
@@ -0,0 +1,196 @@
+import json
+import os
+import sqlite3
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import httpx
+
+from .shopify import Shopify
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    resource TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (resource, id)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    resource TEXT PRIMARY KEY,
+    watermark TEXT,
+    page_info TEXT,
+    run_start TEXT
+);
+"""
+
+
+@dataclass
+class Checkpoint:
+    resource: str
+    watermark: str | None = None
+    page_info: str | None = None
+    run_start: str | None = None
+
+
+def _later(a: str | None, b: str | None) -> str | None:
+    if a is None or b is None:
+        return a or b
+    return a if datetime.fromisoformat(a) >= datetime.fromisoformat(b) else b
+
+
+class SyncStore:
+    """
+    A local SQLite copy of the store's records, with the sync checkpoints.
+
+    The store is small and every write is one page, so it is used
+    straight from the event loop.
+    """
+
+    def __init__(self, path: str | os.PathLike = "shopipy.sqlite3") -> None:
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def checkpoint(self, resource: str) -> Checkpoint:
+        row = self.db.execute(
+            "SELECT watermark, page_info, run_start FROM checkpoints WHERE resource = ?",
+            (resource,),
+        ).fetchone()
+        return Checkpoint(resource, *row) if row else Checkpoint(resource)
+
+    def _save_checkpoint(self, cp: Checkpoint) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+            (cp.resource, cp.watermark, cp.page_info, cp.run_start),
+        )
+
+    def save_page(self, cp: Checkpoint, items: list[dict]) -> None:
+        """
+        Upsert a page of records and move the checkpoint past it,
+        in one transaction.
+        """
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+                (
+                    (cp.resource, i["id"], i.get("updated_at"), json.dumps(i))
+                    for i in items
+                ),
+            )
+            self._save_checkpoint(cp)
+
+    def start(self, cp: Checkpoint, run_start: str) -> None:
+        """
+        Open a run, unless one was interrupted and is being resumed.
+        """
+        if cp.run_start is None:
+            cp.run_start = run_start
+            with self.db:
+                self._save_checkpoint(cp)
+
+    def finish(self, cp: Checkpoint) -> None:
+        """
+        Close a completed run, the next one starts from when it started.
+        """
+        cp.watermark = _later(cp.watermark, cp.run_start)
+        cp.page_info = None
+        cp.run_start = None
+        with self.db:
+            self._save_checkpoint(cp)
+
+    def get(self, resource: str, item_id: int) -> dict | None:
+        row = self.db.execute(
+            "SELECT data FROM records WHERE resource = ? AND id = ?",
+            (resource, item_id),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def records(self, resource: str) -> Iterator[dict]:
+        for (data,) in self.db.execute(
+            "SELECT data FROM records WHERE resource = ? ORDER BY id", (resource,)
+        ):
+            yield json.loads(data)
+
+    def count(self, resource: str) -> int:
+        return self.db.execute(
+            "SELECT COUNT(*) FROM records WHERE resource = ?", (resource,)
+        ).fetchone()[0]
+
+
+class IncrementalSync:
+    """
+    Keep a `SyncStore` up to date with only the records changed since
+    the last run, using `updated_at_min` and cursor pagination.
+
+    The cursor is checkpointed after every page, so an interrupted
+    run picks up at the page where it stopped.
+
+    The pages are in id order, so a record edited during a run can be
+    behind the cursor. The next run starts from when this one started,
+    less `margin` seconds for clock skew, and fetches it again.
+    """
+
+    RESOURCES: dict[str, dict[str, str]] = {
+        "orders": {"status": "any"},
+        "products": {},
+        "customers": {},
+    }
+
+    def __init__(
+        self, shopify: Shopify, store: SyncStore, *, limit=250, margin: float = 60.0
+    ) -> None:
+        self.shopify = shopify
+        self.store = store
+        self.limit = limit
+        self.margin = margin
+
+    async def sync(self, resource: str) -> int:
+        """
+        Sync one resource and return the number of records written.
+        """
+        if resource not in self.RESOURCES:
+            raise AttributeError(f"Can't sync {resource}")
+
+        cp = self.store.checkpoint(resource)
+        try:
+            return await self._run(cp)
+        except httpx.HTTPStatusError as e:
+            # Cursors expire, restart the run from the last watermark
+            if cp.page_info is None or e.response.status_code >= 500:
+                raise
+            cp.page_info = None
+            return await self._run(cp)
+
+    async def _run(self, cp: Checkpoint) -> int:
+        params: dict[str, str] = {**self.RESOURCES[cp.resource]}
+        if cp.watermark is not None:
+            params["updated_at_min"] = cp.watermark
+
+        started = datetime.now(timezone.utc) - timedelta(seconds=self.margin)
+        self.store.start(cp, started.isoformat(timespec="seconds"))
+
+        written = 0
+        async for items, page_info in self.shopify._iter_pages(
+            url_json_path=f"{cp.resource}.json",
+            key=cp.resource,
+            limit=self.limit,
+            page_info=cp.page_info,
+            **params,
+        ):
+            cp.page_info = page_info
+            self.store.save_page(cp, items)
+            written += len(items)
+
+        self.store.finish(cp)
+        return written
+
+    async def sync_all(self) -> dict[str, int]:
+        """
+        Sync every resource, one after the other.
+        """
+        return {resource: await self.sync(resource) for resource in self.RESOURCES}